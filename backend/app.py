@@ -1,9 +1,19 @@
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, request, jsonify
 from flask_cors import CORS
-from flask_socketio import SocketIO, emit
+from flask_socketio import SocketIO
 from werkzeug.security import generate_password_hash, check_password_hash
-from db import get_db_connection
-from exercise_detector import ExerciseDetector
+from db import get_db_connection, get_pool
+from fusion_model import get_shared_model
+from sessions import SessionRegistry
+from inference_engine import BatchInferenceEngine, AdaptiveHop, make_inference_runner
+from wire_format import decode_frame, WireFormatError
+from video_analysis import VideoAnalyzer, sidecar_path
+from jobs import JobQueue
+from media import MediaProcessor, derived_paths
+from storage import ContentStore
+from retention import RetentionEngine, ViewTracker
+from delivery import UploadDelivery
+from uploads import ChunkedUploadStore, UploadError
 import os
 import random
 import string
@@ -30,9 +40,57 @@ os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 
 CORS(app) # Enable CORS for all routes
 socketio = SocketIO(app, cors_allowed_origins="*")
+# A full connection pool is waited on cooperatively, see db.ConnectionPool
+get_pool().sleep = socketio.sleep
+
+# Process role (FITVISOR_ROLE):
+#   'all'       - default; TensorFlow and the model load on the first push-up inference
+#   'inference' - load the model at startup so the first user frame is not the one paying for it
+#   'api'       - never import TensorFlow; auth/leaderboard traffic only, reps are still
+#                 counted over sockets but push-up form inference is disabled
+ROLE = os.getenv('FITVISOR_ROLE', 'all')
+
+def emit_session_stats(sid, stats, keyframe=False):
+    # Only changed fields go out (plus periodic keyframes), see sessions.StatsTracker
+    payload = sessions.stats_delta(sid, stats, keyframe)
+    if payload is not None:
+        socketio.emit('stats_update', payload, to=sid)
+
+def emit_frame_rate(sid):
+    # Tell the client how often to send process_data (exercise needs + server load)
+    fps = sessions.negotiate_rate(sid)
+    if fps is not None:
+        socketio.emit('frame_rate', {'fps': fps}, to=sid)
+
+# Push-up windows from all sessions are batched into one model call.
+# Tune with INFERENCE_MAX_BATCH / INFERENCE_MAX_WAIT_MS.
+# The model call runs on a native worker pool (INFERENCE_POOL / INFERENCE_WORKERS)
+# so TensorFlow never blocks the eventlet hub serving HTTP routes.
+# Sessions infer every INFERENCE_HOP frames; the hop widens up to INFERENCE_MAX_HOP
+# as engine load rises (INFERENCE_ADAPTIVE_HOP=0 to pin it).
+inference_engine = None
+inference_hop = None
+model_loader = None
+if ROLE != 'api':
+    model_loader = get_shared_model
+    pool_kind = os.getenv('INFERENCE_POOL') or ('tpool' if socketio.async_mode == 'eventlet' else 'thread')
+    inference_engine = BatchInferenceEngine(
+        model_loader,
+        sleep=socketio.sleep,
+        runner=make_inference_runner(pool_kind),
+        spawn=socketio.start_background_task,
+        event=socketio.server.eio.create_event()
+    )
+    inference_hop = AdaptiveHop()
+
+# Uploaded recordings are analyzed in a process pool (VIDEO_WORKERS), started on first upload,
+# and transcoded / thumbnailed by at most MEDIA_WORKERS ffmpeg processes
+video_analyzer = VideoAnalyzer()
+media_processor = MediaProcessor()
 
-# Initialize detector
-detector = ExerciseDetector()
+# Detector sessions, one per socket, sharing the single loaded model
+sessions = SessionRegistry(model_loader=model_loader, inference_engine=inference_engine,
+                           on_result=emit_session_stats, hop=inference_hop)
 
 # --- Helper Functions ---
 
@@ -67,46 +125,60 @@ def generate_otp(length=6):
 def generate_token(length=64):
     return ''.join(random.choices(string.ascii_letters + string.digits, k=length))
 
-def update_streak(user_id):
+def update_streak(user_id, cursor=None):
+    """Update the user's daily streak; pass a dictionary cursor to run inside the caller's transaction"""
+    if cursor is not None:
+        return _update_streak(user_id, cursor)
     conn = get_db_connection()
     if not conn:
         return
     cursor = conn.cursor(dictionary=True)
     try:
-        cursor.execute("SELECT streak, last_active_date FROM users WHERE id = %s", (user_id,))
-        user = cursor.fetchone()
-        
-        if user:
-            today = date.today()
-            last_active = user['last_active_date']
-            
-            if last_active != today:
-                if last_active == today - timedelta(days=1):
-                    # Consecutive day, increment streak
-                    new_streak = user['streak'] + 1
-                elif last_active is None or last_active < today - timedelta(days=1):
-                    # Gap > 1 day or first time, reset streak (but start at 1 for today)
-                    new_streak = 1
-                else:
-                    # Already active today (covered by first check, but safe fallback)
-                    new_streak = user['streak']
-
-                cursor.execute(
-                    "UPDATE users SET streak = %s, last_active_date = %s WHERE id = %s",
-                    (new_streak, today, user_id)
-                )
-                conn.commit()
-                print(f"Streak updated for user {user_id}: {new_streak}")
+        if _update_streak(user_id, cursor):
+            conn.commit()
     except Exception as e:
         print(f"Error updating streak: {e}")
     finally:
         cursor.close()
         conn.close()
 
+def _update_streak(user_id, cursor):
+    """Returns True if the streak row was changed"""
+    cursor.execute("SELECT streak, last_active_date FROM users WHERE id = %s", (user_id,))
+    user = cursor.fetchone()
+    
+    if user:
+        today = date.today()
+        last_active = user['last_active_date']
+        
+        if last_active != today:
+            if last_active == today - timedelta(days=1):
+                # Consecutive day, increment streak
+                new_streak = user['streak'] + 1
+            elif last_active is None or last_active < today - timedelta(days=1):
+                # Gap > 1 day or first time, reset streak (but start at 1 for today)
+                new_streak = 1
+            else:
+                # Already active today (covered by first check, but safe fallback)
+                new_streak = user['streak']
+
+            cursor.execute(
+                "UPDATE users SET streak = %s, last_active_date = %s WHERE id = %s",
+                (new_streak, today, user_id)
+            )
+            print(f"Streak updated for user {user_id}: {new_streak}")
+            return True
+    return False
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     return jsonify({"status": "healthy", "message": "Backend is running!"})
 
+@app.route('/api/db/metrics', methods=['GET'])
+def get_db_metrics():
+    # Pool size/usage, borrow waits and timeouts for sizing DB_POOL_SIZE
+    return jsonify(get_pool().stats()), 200
+
 @app.route('/api/signup', methods=['POST'])
 def signup():
     data = request.get_json()
@@ -536,53 +608,203 @@ def upload_video():
     if not user_id or user_id == 'undefined':
         return jsonify({"error": "User ID required"}), 400
 
-    # Ensure upload directory exists
-    UPLOAD_FOLDER = 'uploads'
-    if not os.path.exists(UPLOAD_FOLDER):
-        os.makedirs(UPLOAD_FOLDER)
-    
-    filename = secure_filename(file.filename)
-    timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-    unique_filename = f"{user_id}_{timestamp}_{filename}"
-    file_path = os.path.join(UPLOAD_FOLDER, unique_filename)
-    
-    file.save(file_path)
-    
-    # Analyze video using ExerciseDetector
-    # In a real app, this might be async/background task
-    detector = ExerciseDetector(exercise_type)
-    result = detector.process_video(file_path) # Assumes this returns {reps: int, ...}
-    
-    # If detection logic happens here or elsewhere, retrieve metrics
-    # For now, we trust the 'reps' passed from frontend or calculate roughly
-    # Let's say we trust frontend for now OR the processor returns it.
-    # If the user passed reps manually (e.g. from frontend live count), use that
-    # Otherwise use processed count.
-    
-    # Fallback to frontend count if detector isn't fully implemented to return reps yet
-    final_reps = reps if reps else result.get('reps', 0)
-    
+    # Hashed while it streams to disk; an identical recording is stored only once
+    staged = content_store.stage_stream(file.stream)
+    return register_upload(user_id, exercise_type, reps, staged, upload_extension(file.filename),
+                           request.form.get('socketId'))
+
+# Uploads live in a content-addressed store under uploads/cas/, see storage.py.
+# exercise_sessions.video_path holds the path relative to UPLOAD_FOLDER.
+content_store = ContentStore(app.config['UPLOAD_FOLDER'], sleep=socketio.sleep)
+
+def upload_extension(filename):
+    ext = os.path.splitext(secure_filename(filename or ''))[1].lower()
+    return ext if ext in ('.webm', '.mp4', '.mov', '.mkv') else '.webm'
+
+def register_upload(user_id, exercise_type, reps, staged, ext, socket_id=None):
+    """Store a staged upload, record it and queue its analysis; returns the upload response"""
     # --- SAVE TO DB ---
+    # Stored with the live count from the frontend; the analysis job corrects it when done
     conn = get_db_connection()
-    cursor = conn.cursor()
+    if not conn:
+        content_store.discard(staged)
+        return jsonify({"error": "Database error"}), 500
+    cursor = conn.cursor(dictionary=True)
     try:
-        cursor.execute("""
-            INSERT INTO exercise_sessions (user_id, exercise_type, reps, accuracy, video_path)
-            VALUES (%s, %s, %s, %s, %s)
-        """, (user_id, exercise_type, final_reps, 0, unique_filename))
-        
-        # --- UPDATE STREAK ---
-        update_streak(user_id, cursor) # Pass cursor to reuse connection
-        
-        conn.commit()
+        # Placed and referenced under the store lock, so delete_exercise cannot remove
+        # an existing copy of this content between the two
+        with content_store.lock():
+            video_path, created = content_store.place(staged, ext)
+            file_path = content_store.path(video_path)
+            try:
+                cursor.execute("""
+                    INSERT INTO exercise_sessions (user_id, exercise_type, reps, accuracy, video_path, video_size)
+                    VALUES (%s, %s, %s, %s, %s, %s)
+                """, (user_id, exercise_type, reps or 0, 0, video_path, os.path.getsize(file_path)))
+                session_id = cursor.lastrowid
+
+                # --- UPDATE STREAK ---
+                # Same connection and transaction as the insert
+                update_streak(user_id, cursor)
+                conn.commit()
+            except Exception:
+                # No row references a file stored just now, don't leave it orphaned
+                # (the pool rolls the transaction back when the connection is returned)
+                if created:
+                    content_store.unplace(video_path)
+                raise
     except Exception as e:
         print(f"Error saving video to DB: {e}")
+        content_store.discard(staged)
         return jsonify({"error": "Database error"}), 500
     finally:
         cursor.close()
         conn.close()
 
-    return jsonify({"message": "Upload successful", "reps": final_reps, "analysis": result}), 201
+    # Analysis runs in the background; poll /api/jobs/<id> or wait for 'analysis_complete'
+    try:
+        job_id = analysis_jobs.submit(file_path, exercise_type, context={
+            "sessionId": session_id,
+            "sid": socket_id
+        }, exerciseType=exercise_type)
+    except Exception as e:
+        print(f"❌ Could not queue video analysis: {e}")
+        job_id = None
+
+    # Compact rendition, poster and preview strip, recorded on the row when ready
+    media_job_id = None
+    try:
+        media_job_id = media_jobs.submit(file_path, context={"sessionId": session_id, "videoPath": video_path})
+    except Exception as e:
+        print(f"❌ Could not queue transcoding: {e}")
+
+    response = {"message": "Upload successful", "reps": reps, "jobId": job_id, "mediaJobId": media_job_id}
+    return jsonify(response), 202 if job_id else 201
+
+# --- Chunked, resumable uploads ---
+# POST   /api/uploads                     start, returns uploadId
+# GET    /api/uploads/<id>                acknowledged offset (resume from here)
+# PUT    /api/uploads/<id>?offset=N       raw chunk body, streamed to disk
+# POST   /api/uploads/<id>/complete       finalize, then same as /api/upload-video
+chunked_uploads = ChunkedUploadStore(app.config['UPLOAD_FOLDER'])
+UPLOAD_CHUNK_BYTES = int(os.getenv('UPLOAD_CHUNK_BYTES', 1024 * 1024))
+
+@app.route('/api/uploads', methods=['POST'])
+def start_chunked_upload():
+    data = request.get_json() or {}
+    user_id = data.get('userId')
+    if not user_id or user_id == 'undefined':
+        return jsonify({"error": "User ID required"}), 400
+
+    metadata = {
+        "userId": user_id,
+        "exerciseType": data.get('exerciseType'),
+        "reps": data.get('reps'),
+        "filename": secure_filename(data.get('filename') or 'exercise_session.webm'),
+        "socketId": data.get('socketId')
+    }
+    try:
+        upload_id = chunked_uploads.create(metadata, data.get('totalSize'))
+    except UploadError as e:
+        return jsonify({"error": str(e)}), e.status
+    return jsonify({"uploadId": upload_id, "offset": 0, "chunkSize": UPLOAD_CHUNK_BYTES}), 201
+
+@app.route('/api/uploads/<upload_id>', methods=['GET'])
+def get_chunked_upload(upload_id):
+    try:
+        return jsonify({"uploadId": upload_id, "offset": chunked_uploads.offset(upload_id)}), 200
+    except UploadError as e:
+        return jsonify({"error": str(e)}), e.status
+
+@app.route('/api/uploads/<upload_id>', methods=['PUT'])
+def put_upload_chunk(upload_id):
+    offset = request.args.get('offset', type=int)
+    if offset is None:
+        return jsonify({"error": "offset query parameter required"}), 400
+    try:
+        # request.stream is read in blocks, the chunk never sits in memory whole
+        new_offset = chunked_uploads.append(upload_id, offset, request.stream)
+    except UploadError as e:
+        return jsonify({"error": str(e), "offset": e.offset}), e.status
+    return jsonify({"uploadId": upload_id, "offset": new_offset}), 200
+
+@app.route('/api/uploads/<upload_id>/complete', methods=['POST'])
+def complete_chunked_upload(upload_id):
+    try:
+        data_path, metadata = chunked_uploads.finalize(upload_id)
+    except UploadError as e:
+        return jsonify({"error": str(e), "offset": e.offset}), e.status
+    # The partial upload is only removed once it is stored and recorded; on a database
+    # or lock error it stays complete on disk and the client can call /complete again
+    response = None
+    try:
+        staged = content_store.stage_file(data_path, keep=True)
+        response = register_upload(metadata['userId'], metadata['exerciseType'], metadata['reps'],
+                                   staged, upload_extension(metadata['filename']), metadata.get('socketId'))
+    finally:
+        chunked_uploads.finish(upload_id, success=response is not None and response[1] < 300)
+    return response
+
+def finish_analysis_job(job, context):
+    """Store the server-side count and tell the uploading client the analysis is done"""
+    result = job['result']
+    if job['status'] == 'done' and result.get('framesAnalyzed'):
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("UPDATE exercise_sessions SET reps = %s, accuracy = %s WHERE id = %s",
+                           (result['reps'], result['report']['score'], context['sessionId']))
+            conn.commit()
+        except Exception as e:
+            print(f"Error saving analysis for session {context['sessionId']}: {e}")
+        finally:
+            cursor.close()
+            conn.close()
+
+    if context.get('sid'):
+        socketio.emit('analysis_complete', {
+            "jobId": job['id'],
+            "status": job['status'],
+            "result": result,
+            "error": job['error']
+        }, to=context['sid'])
+
+def finish_media_job(job, context):
+    """Record the derived rendition, poster and preview strip on the session row"""
+    if job['status'] != 'done' or not job['result']:
+        return
+    # Derived files sit next to the video, store them relative to UPLOAD_FOLDER like video_path
+    video_dir = os.path.dirname(context['videoPath'])
+    columns = {column: os.path.join(video_dir, name) for column, name in job['result'].items()}
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        assignments = ", ".join(f"{column} = %s" for column in columns)
+        cursor.execute(f"UPDATE exercise_sessions SET {assignments} WHERE id = %s",
+                       (*columns.values(), context['sessionId']))
+        conn.commit()
+    except Exception as e:
+        print(f"Error saving media paths for session {context['sessionId']}: {e}")
+    finally:
+        cursor.close()
+        conn.close()
+
+analysis_jobs = JobQueue(video_analyzer, spawn=socketio.start_background_task,
+                         sleep=socketio.sleep, on_complete=finish_analysis_job)
+media_jobs = JobQueue(media_processor, spawn=socketio.start_background_task,
+                      sleep=socketio.sleep, on_complete=finish_media_job, kind='media')
+
+@app.route('/api/jobs/metrics', methods=['GET'])
+def get_job_metrics():
+    # Queue depth, failures and wait/run time percentiles for sizing VIDEO_WORKERS / MEDIA_WORKERS
+    return jsonify({"analysis": analysis_jobs.stats(), "media": media_jobs.stats()}), 200
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    job = analysis_jobs.get(job_id) or media_jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job), 200
 
 @app.route('/api/exercises', methods=['GET'])
 def get_exercises():
@@ -616,12 +838,21 @@ def delete_exercise(id):
         session = cursor.fetchone()
         
         if session:
-            video_path = os.path.join(app.config['UPLOAD_FOLDER'], session['video_path'])
-            if os.path.exists(video_path):
-                os.remove(video_path)
-            
-            cursor.execute("DELETE FROM exercise_sessions WHERE id = %s", (id,))
-            conn.commit()
+            # Stored files are shared by every session with the same recording; only
+            # remove them once the last reference is gone. The store lock keeps a
+            # concurrent duplicate upload from referencing them in between.
+            with content_store.lock():
+                cursor.execute("DELETE FROM exercise_sessions WHERE id = %s", (id,))
+                conn.commit()
+
+                if session['video_path']:
+                    cursor.execute("SELECT COUNT(*) AS refs FROM exercise_sessions WHERE video_path = %s",
+                                   (session['video_path'],))
+                    if cursor.fetchone()['refs'] == 0:
+                        video_path = content_store.path(session['video_path'])
+                        for stored in [video_path, sidecar_path(video_path), *derived_paths(video_path).values()]:
+                            if os.path.exists(stored):
+                                os.remove(stored)
             return jsonify({"message": "Exercise deleted successfully"}), 200
         else:
             return jsonify({"error": "Exercise not found"}), 404
@@ -633,9 +864,60 @@ def delete_exercise(id):
         cursor.close()
         conn.close()
 
-@app.route('/uploads/<filename>')
+# Retention (see retention.py): quotas / max age from RETENTION_* env, evicting least
+# recently viewed videos first. Only runs when a limit is configured, never in the inference role.
+retention_engine = RetentionEngine(get_db_connection, content_store)
+view_tracker = ViewTracker()
+
+@app.route('/api/retention/report', methods=['GET'])
+def retention_report():
+    # Dry run: what the next pass would evict and why
+    report = retention_engine.run_once(dry_run=True)
+    if report is None:
+        return jsonify({"error": "Database error"}), 500
+    return jsonify(report), 200
+
+@app.route('/api/retention/run', methods=['POST'])
+def run_retention():
+    report = retention_engine.run_once(dry_run=request.args.get('dryRun') == '1')
+    if report is None:
+        return jsonify({"error": "Database error"}), 500
+    return jsonify(report), 200
+
+def touch_video(filename):
+    """Record a view for retention ordering (throttled, see ViewTracker)"""
+    if not view_tracker.should_touch(filename):
+        return
+    conn = get_db_connection()
+    if not conn:
+        return
+    cursor = conn.cursor()
+    try:
+        cursor.execute("UPDATE exercise_sessions SET last_viewed_at = NOW() WHERE video_path = %s OR transcoded_path = %s",
+                       (filename, filename))
+        conn.commit()
+    except Exception as e:
+        print(f"Error recording view of {filename}: {e}")
+    finally:
+        cursor.close()
+        conn.close()
+
+# Range requests, strong ETags, year-long caching for content-addressed files, and
+# optional hand-off of the transfer to the front proxy (UPLOAD_ACCEL), see delivery.py
+upload_delivery = UploadDelivery(app.config['UPLOAD_FOLDER'])
+
+@app.route('/uploads/<path:filename>')
 def uploaded_file(filename):
-    return send_from_directory(app.config['UPLOAD_FOLDER'], filename)
+    # Resolved first: missing, hidden and sidecar paths 404 without touching the database
+    path = upload_delivery.resolve(filename)
+    if path is None:
+        return jsonify({"error": "File not found"}), 404
+    # Posters and preview strips load with every listing and do not count as views;
+    # neither do seeks (ranges not starting at 0) within a playback already counted
+    starts_playback = request.range is None or request.range.ranges[0][0] == 0
+    if not filename.endswith('.jpg') and starts_playback:
+        touch_video(filename)
+    return upload_delivery.send(request, filename, path)
 
 @app.route('/api/ask-ai', methods=['POST'])
 def ask_ai():
@@ -694,43 +976,55 @@ def ask_ai():
 @socketio.on('connect')
 def handle_connect():
     print('Client connected')
+    emit_frame_rate(request.sid)
 
 @socketio.on('disconnect')
 def handle_disconnect():
-    print('Client disconnected')
+    detector = sessions.remove(request.sid)
+    if detector is not None and detector.inference_gate.executed:
+        gate = detector.inference_gate.stats()
+        print(f"Client disconnected (inference: {gate['executed']} run, {gate['reused']} reused, "
+              f"{gate['skipped']} skipped, {detector.frames_dropped} stale frames dropped)")
+    else:
+        print('Client disconnected')
 
 @socketio.on('start_exercise')
 def handle_start_exercise():
-    detector.start_session()
+    sessions.get(request.sid).start_session()
+    emit_frame_rate(request.sid)
 
 @socketio.on('stop_exercise')
 def handle_stop_exercise():
+    detector = sessions.get(request.sid)
     detector.end_session()
     # Emit final stats immediately to trigger completion on frontend
-    # We need to construct the current stats state
-    stats = {
-        "reps": detector.counter,
-        "feedback": detector.feedback,
-        "stage": detector.stage,
-        "completed": detector.completed,
-        "isActive": detector.is_active,
-        "gestureProgress": 0,
-        "report": detector.get_report()
-    }
-    emit('stats_update', stats)
+    emit_session_stats(request.sid, detector.get_stats(), keyframe=True)
 
 
 @socketio.on('process_data')
 def handle_data(data):
-    # data structure: { 'landmarks': {...}, 'angles': {...}, 'type': 'Squats' }
-    exercise_type = data.get('type')
-    
-    if not exercise_type:
-        return
-        
-    stats = detector.process_data(data, exercise_type)
+    # Binary frame (see wire_format.py) or legacy JSON:
+    # { 'landmarks': {...}, 'angles': {...}, 'type': 'Squats' }
+    detector = sessions.get(request.sid)
+
+    if isinstance(data, (bytes, bytearray)):
+        try:
+            exercise_type, seq, points, present = decode_frame(data)
+        except WireFormatError as e:
+            print(f"Dropping malformed frame: {e}")
+            return
+        if seq <= detector.last_frame_seq:
+            return # Out of order, a newer frame was already processed
+        detector.last_frame_seq = seq
+        stats = detector.process_frame(points, present, exercise_type)
+    else:
+        exercise_type = data.get('type')
+        if not exercise_type:
+            return
+        stats = detector.process_data(data, exercise_type)
     
-    emit('stats_update', stats)
+    emit_session_stats(request.sid, stats)
+    emit_frame_rate(request.sid)
 
 @app.route('/api/contact', methods=['POST'])
 def contact_support():
@@ -759,5 +1053,22 @@ def contact_support():
     else:
         return jsonify({"error": "Failed to send email"}), 500
 
+def start_background_work():
+    """Model preload and background loops, started by the serving process only.
+
+    Kept out of module scope: the video analysis pool spawns workers that
+    re-import this file as __mp_main__, and they must not load TensorFlow or
+    run the inference, hop and retention loops.
+    """
+    if ROLE == 'inference':
+        get_shared_model()
+    if inference_engine is not None:
+        socketio.start_background_task(inference_engine.run_forever)
+        socketio.start_background_task(inference_hop.run_forever, inference_engine, socketio.sleep)
+    # Retention only runs when a limit is configured, never in the inference role
+    if retention_engine.enabled() and ROLE != 'inference':
+        socketio.start_background_task(retention_engine.run_forever, socketio.sleep)
+
 if __name__ == '__main__':
+    start_background_work()
     socketio.run(app, debug=True, port=8000, host='0.0.0.0')
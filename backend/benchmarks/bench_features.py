@@ -0,0 +1,86 @@
+"""Micro-benchmark: per-landmark dict loop + scalar angle helpers (old detector path)
+vs the vectorized extraction in features.py.
+
+Run from backend/: python benchmarks/bench_features.py
+"""
+import os
+import sys
+import timeit
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from features import ANGLE_TRIPLETS, LEFT_ELBOW, landmarks_to_array, compute_angles, keypoints_flat
+
+FRAMES = 5000
+
+rng = np.random.default_rng(0)
+frames = []
+for _ in range(FRAMES):
+    coords = rng.random((33, 4))
+    frames.append({str(i): {'x': c[0], 'y': c[1], 'z': c[2], 'visibility': c[3]} for i, c in enumerate(coords)})
+
+def calculate_angle_2d(a, b, c):
+    a = np.array([a['x'], a['y']])
+    b = np.array([b['x'], b['y']])
+    c = np.array([c['x'], c['y']])
+    radians = np.arctan2(c[1]-b[1], c[0]-b[0]) - np.arctan2(a[1]-b[1], a[0]-b[0])
+    angle = np.abs(radians*180.0/np.pi)
+    if angle > 180.0:
+        angle = 360-angle
+    return angle
+
+def calculate_angle_3d(a, b, c):
+    a_vec = np.array([a['x'], a['y'], a['z']])
+    b_vec = np.array([b['x'], b['y'], b['z']])
+    c_vec = np.array([c['x'], c['y'], c['z']])
+    ba = a_vec - b_vec
+    bc = c_vec - b_vec
+    cosine_angle = np.dot(ba, bc) / (np.linalg.norm(ba) * np.linalg.norm(bc) + 1e-6)
+    return np.degrees(np.arccos(np.clip(cosine_angle, -1.0, 1.0)))
+
+def scalar_frame(landmarks):
+    kp = []
+    for i in range(33):
+        lm = landmarks.get(str(i))
+        if lm:
+            kp.extend([lm['x'], lm['y'], lm['z']])
+        else:
+            kp.extend([0.0, 0.0, 0.0])
+    angles = []
+    for p1, p2, p3 in ANGLE_TRIPLETS:
+        pt1, pt2, pt3 = landmarks.get(str(p1)), landmarks.get(str(p2)), landmarks.get(str(p3))
+        if pt1 and pt2 and pt3:
+            angles.append(calculate_angle_2d(pt1, pt2, pt3))
+        else:
+            angles.append(180.0)
+    elbow = calculate_angle_3d(landmarks['11'], landmarks['13'], landmarks['15'])
+    return kp, angles, elbow
+
+def vector_frame(landmarks):
+    points, present = landmarks_to_array(landmarks)
+    angles_2d, angles_3d, valid = compute_angles(points, present)
+    return keypoints_flat(points), angles_2d, angles_3d[LEFT_ELBOW]
+
+def vector_frame_dense(points, present):
+    # Frame already decoded into an array (binary wire format)
+    angles_2d, angles_3d, valid = compute_angles(points, present)
+    return keypoints_flat(points), angles_2d, angles_3d[LEFT_ELBOW]
+
+if __name__ == '__main__':
+    for landmarks in frames[:100]:
+        kp, angles, elbow = scalar_frame(landmarks)
+        vkp, vangles, velbow = vector_frame(landmarks)
+        assert np.allclose(kp, vkp, atol=1e-6)
+        assert np.allclose(angles, vangles, atol=1e-2)
+        assert abs(elbow - velbow) < 1e-2
+
+    dense = [landmarks_to_array(f) for f in frames]
+
+    runs = [
+        ("scalar (dict + np helpers)", lambda: [scalar_frame(f) for f in frames]),
+        ("vectorized (from dict)", lambda: [vector_frame(f) for f in frames]),
+        ("vectorized (dense frame)", lambda: [vector_frame_dense(p, m) for p, m in dense]),
+    ]
+    for name, fn in runs:
+        best = min(timeit.repeat(fn, number=1, repeat=3))
+        print(f"{name:28s} {best * 1e6 / FRAMES:8.2f} us/frame")
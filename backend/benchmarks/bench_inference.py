@@ -0,0 +1,53 @@
+"""Per-call latency of the fusion model: Keras predict() vs direct model(...) vs
+the pre-traced KerasFusionModel path the detector uses.
+
+Run from backend/: python benchmarks/bench_inference.py [batch sizes...]
+"""
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+import tensorflow as tf
+from fusion_model import MODEL_PATH, WINDOW_SIZE, NUM_KEYPOINT_FEATURES, NUM_ANGLE_FEATURES, KerasFusionModel
+
+CALLS = 200
+
+def time_calls(fn, calls=CALLS):
+    fn() # First call outside the timing (tracing / adapter setup)
+    samples = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    samples = np.array(samples) * 1000.0
+    return np.median(samples), np.percentile(samples, 95)
+
+if __name__ == '__main__':
+    batch_sizes = [int(b) for b in sys.argv[1:]] or [1, 8, 32]
+    keras_model = tf.keras.models.load_model(MODEL_PATH)
+
+    start = time.perf_counter()
+    traced = KerasFusionModel(keras_model)
+    traced.warm_up()
+    print(f"Trace + warm-up: {(time.perf_counter() - start) * 1000:.1f} ms (paid once at load)\n")
+
+    rng = np.random.default_rng(0)
+    print(f"{'path':16s} {'batch':>5s} {'p50 ms':>8s} {'p95 ms':>8s}")
+    for batch_size in batch_sizes:
+        kp = rng.random((batch_size, WINDOW_SIZE, NUM_KEYPOINT_FEATURES), dtype=np.float32)
+        ang = (rng.random((batch_size, WINDOW_SIZE, NUM_ANGLE_FEATURES), dtype=np.float32) * 180).astype(np.float32)
+        inputs = {'keypoints_input': kp, 'angles_input': ang}
+
+        expected = keras_model.predict(inputs, verbose=0)
+        assert np.allclose(traced.infer(kp, ang), expected, atol=1e-5)
+
+        paths = [
+            ("predict()", lambda: keras_model.predict(inputs, verbose=0)),
+            ("model(...)", lambda: keras_model(inputs, training=False).numpy()),
+            ("traced infer()", lambda: traced.infer(kp, ang)),
+        ]
+        for name, fn in paths:
+            p50, p95 = time_calls(fn)
+            print(f"{name:16s} {batch_size:5d} {p50:8.2f} {p95:8.2f}")
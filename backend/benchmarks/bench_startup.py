@@ -0,0 +1,58 @@
+"""Cold-start time and peak RSS of the backend for each FITVISOR_ROLE.
+
+Every role is measured in a fresh interpreter: import app and run
+start_background_work() (what `python app.py` does at boot), then force the
+model load to show what the first push-up inference costs in the lazy roles.
+
+Run from backend/: python benchmarks/bench_startup.py [api all inference]
+"""
+import json
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+PROBE = r"""
+import json, resource, sys, time
+
+def rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+start = time.perf_counter()
+import app
+app.start_background_work()
+boot = time.perf_counter() - start
+boot_rss = rss_mb()
+tf_at_boot = 'tensorflow' in sys.modules
+
+start = time.perf_counter()
+from fusion_model import get_shared_model
+get_shared_model()
+first_inference = time.perf_counter() - start
+
+print(json.dumps({
+    "boot_s": boot,
+    "boot_rss_mb": boot_rss,
+    "tf_at_boot": tf_at_boot,
+    "model_load_s": first_inference,
+    "peak_rss_mb": rss_mb()
+}))
+"""
+
+def measure(role):
+    env = dict(os.environ, FITVISOR_ROLE=role)
+    result = subprocess.run([sys.executable, '-c', PROBE], cwd=BACKEND_DIR, env=env,
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"{role} probe failed:\n{result.stderr}")
+    # app prints its own startup logs, the JSON line is last
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+if __name__ == '__main__':
+    roles = sys.argv[1:] or ['api', 'all', 'inference']
+    print(f"{'role':10s} {'boot s':>8s} {'boot RSS MB':>12s} {'TF at boot':>11s} {'+model s':>9s} {'peak RSS MB':>12s}")
+    for role in roles:
+        r = measure(role)
+        print(f"{role:10s} {r['boot_s']:8.2f} {r['boot_rss_mb']:12.1f} {str(r['tf_at_boot']):>11s} "
+              f"{r['model_load_s']:9.2f} {r['peak_rss_mb']:12.1f}")
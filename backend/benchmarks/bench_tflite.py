@@ -0,0 +1,88 @@
+"""Accuracy parity, latency and memory of the TFLite and NumPy backends vs the Keras model.
+
+Parity is measured on recorded windows (.npz with 'keypoints' (N, 20, 99) and
+'angles' (N, 20, 8)): max |diff| of the hips_sagging / hips_piking
+probabilities and how often the thresholded labels agree with Keras. Memory
+is the peak RSS (VmHWM) of a fresh interpreter that loads and warms only that
+backend; ru_maxrss is not used because a child inherits its parent's peak on
+Linux, which here already includes the Keras reference.
+
+Run from backend/ after convert_tflite.py / export_numpy_weights.py:
+    python benchmarks/bench_tflite.py --windows recorded_windows.npz
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import numpy as np
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, BACKEND_DIR)
+from fusion_model import MODEL_FILES, load_fusion_model
+
+LABELS = ['hips_sagging', 'hips_piking']
+CONFIDENCE_THRESHOLD = 0.7
+CALLS = 200
+
+MEMORY_PROBE = r"""
+import json, sys
+from fusion_model import load_fusion_model
+model = load_fusion_model(sys.argv[1])
+with open('/proc/self/status') as f:
+    peak_kb = next(int(line.split()[1]) for line in f if line.startswith('VmHWM:'))
+print(json.dumps({"peak_rss_mb": peak_kb / 1024.0}))
+"""
+
+def load_windows(path):
+    if path:
+        data = np.load(path)
+        return data['keypoints'].astype(np.float32), data['angles'].astype(np.float32)
+    print("⚠️  No recorded windows given, parity on random data is only a smoke test\n")
+    rng = np.random.default_rng(1)
+    return ((rng.random((256, 20, 99)) - 0.5).astype(np.float32),
+            (rng.random((256, 20, 8)) * 180).astype(np.float32))
+
+def latency_ms(model, kp, ang):
+    samples = []
+    for i in range(CALLS):
+        j = i % len(kp)
+        start = time.perf_counter()
+        model.infer(kp[j:j + 1], ang[j:j + 1])
+        samples.append(time.perf_counter() - start)
+    return np.median(samples) * 1000.0
+
+def peak_rss_mb(backend):
+    result = subprocess.run([sys.executable, '-c', MEMORY_PROBE, backend], cwd=BACKEND_DIR,
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        return float('nan')
+    return json.loads(result.stdout.strip().splitlines()[-1])['peak_rss_mb']
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--windows', help='.npz of recorded windows')
+    args = parser.parse_args()
+
+    kp, ang = load_windows(args.windows)
+    reference = load_fusion_model('keras').infer(kp, ang)
+    reference_labels = reference > CONFIDENCE_THRESHOLD
+
+    print(f"{'backend':12s} {'size KB':>8s} {'max|diff|':>10s} " +
+          " ".join(f"{label + ' agree':>18s}" for label in LABELS) +
+          f" {'p50 ms':>8s} {'peak RSS MB':>12s}")
+    for backend, path in MODEL_FILES.items():
+        if not os.path.exists(path):
+            print(f"{backend:12s} (missing, run convert_tflite.py / export_numpy_weights.py)")
+            continue
+        model = load_fusion_model(backend)
+        preds = model.infer(kp, ang)
+        max_diff = np.abs(preds - reference).max()
+        agreement = ((preds > CONFIDENCE_THRESHOLD) == reference_labels).mean(axis=0) * 100
+        print(f"{backend:12s} {os.path.getsize(path) / 1024:8.1f} {max_diff:10.4f} " +
+              " ".join(f"{a:17.1f}%" for a in agreement) +
+              f" {latency_ms(model, kp, ang):8.2f} {peak_rss_mb(backend):12.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""Convert pushup_fusion_model.keras into TFLite flatbuffers for CPU serving.
+
+Writes pushup_fusion_model_fp16.tflite (float16 weights) and
+pushup_fusion_model_int8.tflite (int8 weights/activations, float I/O).
+Serve one with FUSION_MODEL_BACKEND=tflite-fp16 or tflite-int8.
+
+int8 calibration needs representative windows: pass an .npz with
+'keypoints' (N, 20, 99) and 'angles' (N, 20, 8) arrays recorded from real
+sessions. Without one, random windows are used and int8 accuracy will suffer.
+
+The LSTMs are unrolled before conversion (the window is only 10 steps after
+pooling): the rolled while-loop form needs TensorList/Flex ops that the
+builtin TFLite runtime cannot run, and would not resize to other batch sizes.
+
+Usage: python convert_tflite.py [--windows recorded_windows.npz]
+"""
+import argparse
+import numpy as np
+import tensorflow as tf
+from fusion_model import MODEL_PATH, MODEL_FILES, WINDOW_SIZE, NUM_KEYPOINT_FEATURES, NUM_ANGLE_FEATURES
+
+CALIBRATION_WINDOWS = 200
+
+def load_windows(path):
+    if path:
+        data = np.load(path)
+        return data['keypoints'].astype(np.float32), data['angles'].astype(np.float32)
+
+    print("⚠️  No recorded windows given, calibrating int8 on random data")
+    rng = np.random.default_rng(0)
+    kp = (rng.random((CALIBRATION_WINDOWS, WINDOW_SIZE, NUM_KEYPOINT_FEATURES)) - 0.5).astype(np.float32)
+    ang = (rng.random((CALIBRATION_WINDOWS, WINDOW_SIZE, NUM_ANGLE_FEATURES)) * 180).astype(np.float32)
+    return kp, ang
+
+def unrolled_copy(model):
+    """Same network and weights with every LSTM unrolled into plain ops"""
+    config = model.get_config()
+    for layer in config['layers']:
+        if layer['class_name'] == 'LSTM':
+            layer['config']['unroll'] = True
+    unrolled = model.__class__.from_config(config)
+    unrolled.set_weights(model.get_weights())
+    return unrolled
+
+def convert_fp16(model):
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.target_spec.supported_types = [tf.float16]
+    return converter.convert()
+
+def convert_int8(model, kp, ang):
+    def representative_dataset():
+        # Keyed by input name: the converted signature orders inputs alphabetically
+        for i in range(min(len(kp), CALIBRATION_WINDOWS)):
+            yield {'keypoints_input': kp[i:i + 1], 'angles_input': ang[i:i + 1]}
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.representative_dataset = representative_dataset
+    return converter.convert()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--windows', help='.npz with recorded keypoints/angles windows for int8 calibration')
+    args = parser.parse_args()
+
+    model = unrolled_copy(tf.keras.models.load_model(MODEL_PATH))
+    kp, ang = load_windows(args.windows)
+
+    for backend, blob in [
+        ('tflite-fp16', convert_fp16(model)),
+        ('tflite-int8', convert_int8(model, kp, ang)),
+    ]:
+        with open(MODEL_FILES[backend], 'wb') as f:
+            f.write(blob)
+        print(f"✅ {backend}: {MODEL_FILES[backend]} ({len(blob) / 1024:.1f} KB)")
+
+if __name__ == '__main__':
+    main()
@@ -1,18 +1,232 @@
 import mysql.connector
 from dotenv import load_dotenv
 import os
+import time
+import threading
+import weakref
 
 load_dotenv()
 
+def _connect():
+    return mysql.connector.connect(
+        host=os.getenv('DB_HOST'),
+        user=os.getenv('DB_USER'),
+        password=os.getenv('DB_PASSWORD'),
+        database=os.getenv('DB_NAME')
+    )
+
+class _PoolEntry:
+    __slots__ = ('raw', 'created_at', 'last_used')
+
+    def __init__(self, raw, now):
+        self.raw = raw
+        self.created_at = now
+        self.last_used = now
+
+class PooledConnection:
+    """A borrowed connection; close() hands it back to the pool instead of disconnecting.
+
+    Everything else (cursor, commit, rollback, ...) goes to the underlying
+    mysql.connector connection, so callers keep the usual
+    conn = get_db_connection() ... conn.close() pattern. Each borrow gets its
+    own handle, so a second close() can never return someone else's connection.
+
+    cursor() pings the server, so a connection that died inside the ping
+    interval (MySQL restart) fails there, before the caller's try/finally;
+    it is replaced by a fresh one, or its slot is freed if that fails too. A
+    handle dropped without close() returns its slot when garbage collected.
+    """
+
+    def __init__(self, pool, entry):
+        self._pool = pool
+        self._entry = entry
+        self._raw = entry.raw
+        self._finalizer = weakref.finalize(self, pool._release, entry)
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def cursor(self, *args, **kwargs):
+        try:
+            return self._raw.cursor(*args, **kwargs)
+        except (mysql.connector.errors.OperationalError, mysql.connector.errors.InterfaceError):
+            if self._entry is None:
+                raise
+        entry = self._entry
+        try:
+            self._raw = self._pool._reconnect(entry)
+        except Exception:
+            self._entry = None
+            self._finalizer.detach()
+            self._pool._drop(entry)
+            raise
+        return self._raw.cursor(*args, **kwargs)
+
+    def close(self):
+        entry, self._entry = self._entry, None
+        if entry is not None:
+            self._finalizer.detach()
+            self._pool._release(entry)
+
+class ConnectionPool:
+    """Process-wide, size-bounded pool of MySQL connections.
+
+    borrow() takes the most recently returned idle connection (LIFO, so spare
+    connections age out), opening a new one while fewer than DB_POOL_SIZE exist
+    and otherwise waiting up to DB_POOL_TIMEOUT seconds for one to come back.
+    A connection idle for more than DB_POOL_PING_INTERVAL seconds is pinged
+    before use, and connections older than DB_POOL_MAX_LIFETIME seconds are
+    closed and replaced, ahead of server-side wait_timeout kills. Returned
+    connections with an open transaction are rolled back.
+
+    An exhausted pool is waited on by polling with `sleep`, never by blocking
+    on a lock: under eventlet threading is not monkey-patched, and a blocked
+    OS thread would keep the green threads holding connections from ever
+    returning them. The app sets sleep to socketio.sleep.
+    """
+
+    def __init__(self, connect=_connect, size=None, timeout=None, max_lifetime=None, ping_interval=None, sleep=time.sleep):
+        self.connect = connect
+        self.size = int(size or os.getenv('DB_POOL_SIZE', 10))
+        self.timeout = float(timeout or os.getenv('DB_POOL_TIMEOUT', 5))
+        self.max_lifetime = float(max_lifetime or os.getenv('DB_POOL_MAX_LIFETIME', 1800))
+        self.ping_interval = float(ping_interval if ping_interval is not None else os.getenv('DB_POOL_PING_INTERVAL', 5))
+        self.sleep = sleep
+        self._idle = []
+        self._open = 0 # Idle + borrowed
+        self._lock = threading.Lock() # Never held across I/O or sleep
+        self.metrics = {
+            "borrows": 0,        # Successful borrows
+            "waits": 0,          # Borrows that found the pool exhausted
+            "waitSeconds": 0.0,
+            "maxWaitSeconds": 0.0,
+            "timeouts": 0,
+            "created": 0,
+            "failedConnects": 0,
+            "recycled": 0,       # Closed for exceeding DB_POOL_MAX_LIFETIME
+            "failedPings": 0,
+            "broken": 0          # Found dead in cursor() or when its rollback failed on return
+        }
+
+    def _count(self, name):
+        with self._lock:
+            self.metrics[name] += 1
+
+    def _expired(self, conn, now):
+        return now - conn.created_at > self.max_lifetime
+
+    def _discard(self, conn):
+        try:
+            conn.raw.close()
+        except Exception:
+            pass
+
+    def borrow(self):
+        """A live PooledConnection; raises mysql.connector.Error if none can be had"""
+        started = time.monotonic()
+        waited = False
+        while True:
+            with self._lock:
+                conn = self._idle.pop() if self._idle else None
+                if conn is not None or self._open < self.size:
+                    if conn is None:
+                        self._open += 1 # Reserve the slot, connect outside the lock
+                    break
+                if time.monotonic() - started >= self.timeout:
+                    self.metrics['timeouts'] += 1
+                    raise mysql.connector.errors.PoolError(f"No database connection free after {self.timeout}s")
+            waited = True
+            self.sleep(0.005)
+
+        now = time.monotonic()
+        if conn is not None and self._expired(conn, now):
+            self._discard(conn)
+            self._count('recycled')
+            conn = None
+        if conn is not None and now - conn.last_used > self.ping_interval:
+            try:
+                conn.raw.ping(reconnect=False)
+            except Exception:
+                self._discard(conn)
+                self._count('failedPings')
+                conn = None
+
+        if conn is None:
+            try:
+                conn = _PoolEntry(self.connect(), now)
+            except Exception:
+                with self._lock:
+                    self._open -= 1
+                    self.metrics['failedConnects'] += 1
+                raise
+            self._count('created')
+
+        with self._lock:
+            self.metrics['borrows'] += 1
+            if waited:
+                wait = time.monotonic() - started
+                self.metrics['waits'] += 1
+                self.metrics['waitSeconds'] += wait
+                self.metrics['maxWaitSeconds'] = max(self.metrics['maxWaitSeconds'], wait)
+        return PooledConnection(self, conn)
+
+    def _reconnect(self, conn):
+        """Swap a dead connection for a fresh one in the same slot"""
+        self._discard(conn)
+        self._count('broken')
+        now = time.monotonic()
+        conn.raw = self.connect()
+        conn.created_at = conn.last_used = now
+        self._count('created')
+        return conn.raw
+
+    def _drop(self, conn):
+        """Give up a borrowed slot whose connection is gone"""
+        self._discard(conn)
+        with self._lock:
+            self._open -= 1
+            self.metrics['failedConnects'] += 1
+
+    def _release(self, conn):
+        now = time.monotonic()
+        reason = 'recycled' if self._expired(conn, now) else None
+        if reason is None:
+            try:
+                if conn.raw.in_transaction:
+                    conn.raw.rollback() # Don't leak an uncommitted transaction to the next borrower
+            except Exception:
+                reason = 'broken'
+        if reason is not None:
+            self._discard(conn)
+
+        conn.last_used = now
+        with self._lock:
+            if reason is None:
+                self._idle.append(conn)
+            else:
+                self._open -= 1
+                self.metrics[reason] += 1
+
+    def stats(self):
+        with self._lock:
+            idle = len(self._idle)
+            return dict(self.metrics, size=self.size, open=self._open, idle=idle, inUse=self._open - idle)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool()
+    return _pool
+
 def get_db_connection():
+    """Borrow a pooled connection (conn.close() returns it), or None if the database is unavailable"""
     try:
-        connection = mysql.connector.connect(
-            host=os.getenv('DB_HOST'),
-            user=os.getenv('DB_USER'),
-            password=os.getenv('DB_PASSWORD'),
-            database=os.getenv('DB_NAME')
-        )
-        return connection
+        return get_pool().borrow()
     except mysql.connector.Error as err:
         print(f"Error connecting to database: {err}")
         return None
@@ -0,0 +1,98 @@
+import os
+from flask import Response, abort, send_file
+from werkzeug.security import safe_join
+
+# Content-addressed uploads (storage.py) never change under the same name, so
+# browsers and CDNs may keep them for a year.
+IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+# Derived files (rendition, poster, strip) are re-encoded after retention or a
+# MEDIA_* change, and legacy flat uploads: cache, but revalidate with the ETag
+MUTABLE_CACHE = 'public, max-age=3600, must-revalidate'
+
+MIME_TYPES = {
+    '.webm': 'video/webm',
+    '.mp4': 'video/mp4',
+    '.mov': 'video/quicktime',
+    '.mkv': 'video/x-matroska',
+    '.jpg': 'image/jpeg'
+}
+
+class UploadDelivery:
+    """Serves files from uploads/ with Range support, strong ETags and cache headers.
+
+    UPLOAD_ACCEL picks who streams the bytes:
+      ''         - this worker, via send_file (Range / If-None-Match / If-Range handled by werkzeug)
+      'nginx'    - X-Accel-Redirect to UPLOAD_ACCEL_PREFIX + path; nginx streams the file
+                   and answers Range itself (location marked `internal`, aliased to uploads/)
+      'sendfile' - X-Sendfile with the absolute path (Apache mod_xsendfile, lighttpd)
+    With a proxy doing the transfer, a video seek costs the Python worker one
+    header-only response instead of a green thread for the whole download.
+
+    nginx:
+        location /protected-uploads/ {
+            internal;
+            alias /path/to/backend/uploads/;
+        }
+    """
+
+    def __init__(self, upload_dir, accel=None, accel_prefix=None):
+        self.upload_dir = os.path.abspath(upload_dir)
+        self.accel = accel if accel is not None else os.getenv('UPLOAD_ACCEL', '')
+        self.accel_prefix = (accel_prefix or os.getenv('UPLOAD_ACCEL_PREFIX', '/protected-uploads/')).rstrip('/') + '/'
+
+    def resolve(self, filename):
+        """Absolute path for a servable upload, or None. Working dirs and sidecars are private."""
+        if any(part.startswith('.') for part in filename.split('/')) or filename.endswith('.npy'):
+            return None
+        path = safe_join(self.upload_dir, filename)
+        if path is None or not os.path.isfile(path):
+            return None
+        return path
+
+    @staticmethod
+    def content_addressed(filename):
+        """True for a stored upload itself (cas/ab/cd/<sha256><ext>), not the files derived from it"""
+        if not filename.startswith('cas/'):
+            return False
+        name = os.path.basename(filename)
+        return len(os.path.splitext(name)[0]) == 64 and name.count('.') == 1
+
+    @classmethod
+    def etag(cls, filename, path):
+        """Strong validator: the content digest for stored uploads, name, size and mtime otherwise"""
+        if cls.content_addressed(filename):
+            return os.path.basename(filename).split('.', 1)[0]
+        stat = os.stat(path)
+        version = f"{stat.st_size:x}-{int(stat.st_mtime * 1000):x}"
+        # Derived files share their upload's digest prefix, so the full name keeps their tags apart
+        return f"{os.path.basename(filename)}-{version}" if filename.startswith('cas/') else version
+
+    def send(self, request, filename, path=None):
+        """Response for an upload; pass the path from resolve() if the caller already has it"""
+        path = path or self.resolve(filename)
+        if path is None:
+            abort(404)
+
+        immutable = self.content_addressed(filename)
+        etag = self.etag(filename, path)
+        cache_control = IMMUTABLE_CACHE if immutable else MUTABLE_CACHE
+        mimetype = MIME_TYPES.get(os.path.splitext(filename)[1].lower(), 'application/octet-stream')
+
+        if self.accel:
+            if request.if_none_match.contains(etag):
+                response = Response(status=304)
+            else:
+                response = Response(mimetype=mimetype)
+                if self.accel == 'nginx':
+                    response.headers['X-Accel-Redirect'] = self.accel_prefix + filename
+                else:
+                    response.headers['X-Sendfile'] = path
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = cache_control
+            response.headers['Accept-Ranges'] = 'bytes'
+            return response
+
+        response = send_file(path, mimetype=mimetype, etag=etag, conditional=True,
+                             max_age=None, last_modified=os.path.getmtime(path))
+        response.headers['Cache-Control'] = cache_control
+        return response
@@ -1,13 +1,12 @@
-from collections import deque
-import cv2
-import numpy as np
-import tensorflow as tf
-import os
 import time
-import math
+from fusion_model import get_shared_model
+from ring_buffer import WindowBuffer
+from report_stats import RunningReport
+from inference_gate import InferenceGate
+from features import landmarks_to_array, compute_angles, keypoints_flat, LEFT_ELBOW, LEFT_KNEE
 
 class ExerciseDetector:
-    def __init__(self):
+    def __init__(self, model=None, model_loader=get_shared_model):
         self.current_exercise = None
         self.counter = 0
         self.stage = None
@@ -16,10 +15,19 @@ class ExerciseDetector:
         # State
         self.completed = False
         self.is_active = False 
+        self.final_report = None
         
-        # Model
-        self.model = None
-        self.load_model()
+        # Model (shared across sessions, only the per-session state lives here).
+        # Resolved lazily on the first push-up window; model_loader=None disables form inference.
+        self.model = model
+        self.model_loader = model_loader
+
+        # Optional cross-session batching (see inference_engine.py).
+        # When set, windows are queued and on_result(stats) fires once the batch returns.
+        self.inference_engine = None
+        self.on_result = None
+        self.generation = 0 # Bumped on every start so late batch results can be discarded
+        self.last_frame_seq = -1 # Sequence number of the last binary frame processed
         
         # Config
         self.WINDOW_SIZE = 20
@@ -27,110 +35,134 @@ class ExerciseDetector:
         self.LABELS = ['hips_sagging', 'hips_piking']
         
         # Buffers
-        self.kp_buffer = deque(maxlen=self.WINDOW_SIZE)
-        self.ang_buffer = deque(maxlen=self.WINDOW_SIZE)
+        self.kp_buffer = WindowBuffer(self.WINDOW_SIZE, 99)
+        self.ang_buffer = WindowBuffer(self.WINDOW_SIZE, 8)
         
         # Report Stats
-        self.total_frames = 0
-        self.good_frames = 0
-        self.mistakes_set = set() # Unique mistakes detected
-        self.form_scores = []
+        self.report_stats = RunningReport()
+        self.frames_dropped = 0 # Windows superseded before the model got to them
+        self.inference_gate = InferenceGate()
+        self.last_preds = None # Latest model output, reused while the body holds still
+        self.hop = None # Shared AdaptiveHop; None = infer on every full window
+        self.frames_since_inference = 0
+        self.last_inference_time = 0.0
+        # Camera frames each received frame stands for when the client was asked
+        # to send below REFERENCE_FPS (see frame_rate.py), so the hop stays in camera frames
+        self.frame_weight = 1.0
+        self.client_fps = None # Rate last negotiated with the client
         
     def load_model(self):
-        try:
-            model_path = os.path.join(os.path.dirname(__file__), 'pushup_fusion_model.keras')
-            if os.path.exists(model_path):
-                self.model = tf.keras.models.load_model(model_path)
-                print("✅ Keras model loaded successfully")
-            else:
-                print(f"❌ Model not found at {model_path}")
-        except Exception as e:
-            print(f"❌ Error loading model: {e}")
+        if self.model is None and self.model_loader is not None:
+            self.model = self.model_loader()
+        return self.model
+
+    def inference_enabled(self):
+        return self.model is not None or self.model_loader is not None
 
     def start_session(self):
+        self.generation += 1
         self.is_active = True
         self.counter = 0
         self.stage = None
         self.feedback = "Go!"
         self.completed = False
+        self.final_report = None
         
         # Reset buffers and stats
         self.kp_buffer.clear()
         self.ang_buffer.clear()
-        self.total_frames = 0
-        self.good_frames = 0
-        self.mistakes_set = set()
-        self.form_scores = []
+        self.report_stats.reset()
+        self.frames_dropped = 0
+        self.inference_gate.reset()
+        self.last_preds = None
+        self.frames_since_inference = 0
+        self.last_inference_time = 0.0
 
     def end_session(self):
         self.is_active = False
         self.completed = True
         self.feedback = "Session Ended"
-
-    def calculate_angle_2d(self, a, b, c):
-        """Calculate angle between three points (a, b, c) at b using 2D projection"""
-        a = np.array([a['x'], a['y']])
-        b = np.array([b['x'], b['y']])
-        c = np.array([c['x'], c['y']])
-        
-        radians = np.arctan2(c[1]-b[1], c[0]-b[0]) - np.arctan2(a[1]-b[1], a[0]-b[0])
-        angle = np.abs(radians*180.0/np.pi)
-        
-        if angle > 180.0:
-            angle = 360-angle
-            
-        return angle
-
-    def calculate_angle_3d(self, a, b, c):
-        """3D Angle for Squats/Jacks fallback"""
-        try:
-            a_vec = np.array([a['x'], a['y'], a['z']])
-            b_vec = np.array([b['x'], b['y'], b['z']])
-            c_vec = np.array([c['x'], c['y'], c['z']])
-            ba = a_vec - b_vec
-            bc = c_vec - b_vec
-            cosine_angle = np.dot(ba, bc) / (np.linalg.norm(ba) * np.linalg.norm(bc) + 1e-6)
-            angle = np.arccos(np.clip(cosine_angle, -1.0, 1.0))
-            return np.degrees(angle)
-        except:
-            return 180.0
+        # Stats are frozen from here on, so the report is built once
+        self.final_report = self.get_report()
 
     def get_report(self):
+        stats = self.report_stats
         score = 0
-        if self.form_scores:
-            score = int(np.mean(self.form_scores) * 100)
+        mean_score = stats.mean_score()
+        if mean_score is not None:
+            score = int(mean_score * 100)
         
-        if self.total_frames > 5 and len(self.form_scores) == 0:
+        if stats.total_frames > 5 and stats.scored_frames == 0:
              score = 100
-        elif self.total_frames < 20 and score == 0:
+        elif stats.total_frames < 20 and score == 0:
              score = 100 # Default if too short
             
         return {
             "score": score,
-            "mistakes": list(self.mistakes_set),
-            "summary": "Great workout!" if score > 80 else "Watch your form."
+            "mistakes": list(stats.mistake_counts),
+            "mistakeCounts": dict(stats.mistake_counts),
+            "repScores": [int(rep_score * 100) for rep_score in stats.rep_scores],
+            "summary": "Great workout!" if score > 80 else "Watch your form.",
+            "droppedFrames": self.frames_dropped,
+            "inference": self.inference_gate.stats()
+        }
+
+    def process_video(self, video_path, exercise_type, estimator=None, fps=None):
+        """Count reps and score form on a saved recording, like a live session would.
+
+        The video is decoded as a stream and subsampled to fps, or read from its cached
+        landmark sidecar (see video_analysis.py); the landmarks go through process_frame
+        unchanged. Push-up inference runs inline on this detector's own model, so call
+        it from a worker, not the socket loop.
+        """
+        from video_analysis import iter_video_landmarks, analysis_fps
+        from frame_rate import REFERENCE_FPS
+        fps = fps or analysis_fps(exercise_type)
+
+        self.current_exercise = exercise_type
+        self.start_session()
+        self.frame_weight = max(1.0, REFERENCE_FPS / fps)
+        frames = 0
+        for points, present in iter_video_landmarks(video_path, fps, estimator):
+            self.process_frame(points, present, exercise_type)
+            frames += 1
+        self.end_session()
+
+        return {
+            "reps": self.counter,
+            "report": self.final_report,
+            "framesAnalyzed": frames,
+            "fps": fps
         }
 
     def process_data(self, data, exercise_type):
+        points, present = landmarks_to_array(data.get('landmarks', {}))
+        return self.process_frame(points, present, exercise_type)
+
+    def process_frame(self, points, present, exercise_type):
+        """Process one frame given as a (33, 4) x/y/z/visibility array and a (33,) presence mask"""
         if self.current_exercise != exercise_type:
             self.current_exercise = exercise_type
             self.start_session()
             self.is_active = False # Wait for start
-            
-        landmarks = data.get('landmarks', {})
 
         if self.is_active: 
-            self.total_frames += 1
+            self.report_stats.add_frame()
+            # All eight joint angles, 2D and 3D, in one vectorized pass
+            angles_2d, angles_3d, valid = compute_angles(points, present)
             if exercise_type == 'Push-ups':
-               self._process_pushups(landmarks)
+               self._process_pushups(points, present, angles_2d, angles_3d, valid)
             elif exercise_type == 'Squats':
-               self._process_squats(landmarks)
+               self._process_squats(angles_3d, valid)
             elif exercise_type == 'Jumping Jacks':
-               self._process_jumping_jacks(landmarks)
+               self._process_jumping_jacks(points, present)
 
         if not self.is_active and not self.completed:
              self.feedback = "Click Start to begin"
         
+        return self.get_stats()
+
+    def get_stats(self):
         return {
             "reps": self.counter,
             "feedback": self.feedback,
@@ -138,126 +170,117 @@ class ExerciseDetector:
             "completed": self.completed,
             "isActive": self.is_active,
             "gestureProgress": 0,
-            "report": self.get_report() if self.completed else None
+            "report": self.final_report if self.completed else None
         }
 
-    def _process_pushups(self, landmarks):
-        # 1. Heuristic Counting (Using 2D angle for consistency with training data ref or just robust 3D?)
-        # User snippet used 2D angles for MODEL inputs.
-        # But for counting, 3D is usually fine. Let's use 3D for counting robustness.
-        l_sh = landmarks.get('11')
-        l_el = landmarks.get('13')
-        l_wr = landmarks.get('15')
-        
-        if l_sh and l_el and l_wr:
-            elbow_angle = self.calculate_angle_3d(l_sh, l_el, l_wr)
+    def _process_pushups(self, points, present, angles_2d, angles_3d, valid):
+        # 1. Heuristic Counting (3D elbow angle for robustness)
+        if valid[LEFT_ELBOW]:
+            elbow_angle = angles_3d[LEFT_ELBOW]
             if elbow_angle > 160:
                 self.stage = "up"
             if elbow_angle < 90 and self.stage == 'up':
                 self.stage = "down"
                 self.counter += 1
+                self.report_stats.end_rep()
         
-        # 2. Prepare Features for Model (EXACTLY AS USER SNIPPET)
-        # Flatten Keypoints (33 * 3)
-        keypoints_flat = []
-        for i in range(33):
-            key = str(i)
-            lm = landmarks.get(key)
-            if lm:
-                keypoints_flat.extend([lm['x'], lm['y'], lm['z']])
-            else:
-                keypoints_flat.extend([0.0, 0.0, 0.0])
-        
-        # Angles (8) - Using 2D as per snippet
-        angles = []
-        
-        def get_pt(idx): return landmarks.get(str(idx))
-        
-        # Indices from snippet: 
-        # 1. Elbows: (11,13,15), (12,14,16)
-        # 2. Shoulders: (13,11,23), (14,12,24)
-        # 3. Hips: (11,23,25), (12,24,26)
-        # 4. Knees: (23,25,27), (24,26,28)
-        
-        triplets = [
-            (11, 13, 15), (12, 14, 16),
-            (13, 11, 23), (14, 12, 24),
-            (11, 23, 25), (12, 24, 26),
-            (23, 25, 27), (24, 26, 28)
-        ]
-        
-        for p1, p2, p3 in triplets:
-            pt1, pt2, pt3 = get_pt(p1), get_pt(p2), get_pt(p3)
-            if pt1 and pt2 and pt3:
-                angles.append(self.calculate_angle_2d(pt1, pt2, pt3))
-            else:
-                angles.append(180.0)
-                
-        # Buffer Update
-        self.kp_buffer.append(keypoints_flat)
-        self.ang_buffer.append(angles)
+        # 2. Model features: flattened keypoints (33 * 3) + 2D triplet angles (8)
+        self.kp_buffer.append(keypoints_flat(points))
+        self.ang_buffer.append(angles_2d)
         
         # Inference
-        if len(self.kp_buffer) == self.WINDOW_SIZE and self.model:
+        if self.kp_buffer.is_full() and self.inference_enabled():
+            self.frames_since_inference += self.frame_weight
+            if self.hop is not None:
+                now = time.monotonic()
+                if not self.hop.due(self.frames_since_inference, now - self.last_inference_time):
+                    return
+                self.last_inference_time = now
+            self.frames_since_inference = 0
+
+            decision = self.inference_gate.check(points, present, can_reuse=self.last_preds is not None)
+            if decision == 'skip':
+                return
+            if decision == 'reuse':
+                self.apply_predictions(self.last_preds)
+                return
+
+            # Contiguous float32 views, no per-frame copy
+            input_kp = self.kp_buffer.window()
+            input_ang = self.ang_buffer.window()
+
+            if self.inference_engine is not None:
+                # Batched with other sessions; result arrives via _on_prediction
+                generation = self.generation
+                replaced = self.inference_engine.submit(self, input_kp[0], input_ang[0],
+                                                        lambda preds: self._on_prediction(preds, generation))
+                if replaced:
+                    self.frames_dropped += 1
+                return
+
+            if self.load_model() is None:
+                return
+
             try:
-                input_kp = np.array(list(self.kp_buffer)).reshape(1, self.WINDOW_SIZE, 99)
-                input_ang = np.array(list(self.ang_buffer)).reshape(1, self.WINDOW_SIZE, 8)
-                
-                preds = self.model.predict({'keypoints_input': input_kp, 'angles_input': input_ang}, verbose=0)[0]
-                
-                active_errors = []
-                # Multi-label check
-                for i, prob in enumerate(preds):
-                    if prob > self.CONFIDENCE_THRESHOLD:
-                        error_name = self.LABELS[i] # hips_sagging or hips_piking
-                        active_errors.append(error_name)
-                        self.mistakes_set.add(error_name.replace("_", " ").title())
-                
-                if not active_errors:
-                    self.good_frames += 1
-                    self.form_scores.append(1.0)
-                    if self.counter > 0 and self.feedback == "Good push!":
-                         pass # Keep positive feedback
-                    elif self.stage == "down":
-                         self.feedback = "Push Up!"
-                    else:
-                         self.feedback = "Good Form"
-                         
-                else:
-                    self.form_scores.append(0.0)
-                    # Feedback based on error
-                    if "hips_sagging" in active_errors:
-                        self.feedback = "Lift Hips!"
-                    elif "hips_piking" in active_errors:
-                        self.feedback = "Lower Hips!"
-                        
+                preds = self.model.infer(input_kp, input_ang)[0]
+                self.last_preds = preds
+                self.apply_predictions(preds)
             except Exception as e:
                 # print(f"Inference error: {e}")
                 pass
 
-    def _process_squats(self, landmarks):
-        l_hip = landmarks.get('23')
-        l_knee = landmarks.get('25')
-        l_ankle = landmarks.get('27')
-        if l_hip and l_knee and l_ankle:
-            angle = self.calculate_angle_3d(l_hip, l_knee, l_ankle)
+    def _on_prediction(self, preds, generation):
+        if not self.is_active or generation != self.generation:
+            return # Session ended or restarted while the window was queued
+        self.last_preds = preds
+        self.apply_predictions(preds)
+        if self.on_result:
+            self.on_result(self.get_stats())
+
+    def apply_predictions(self, preds):
+        active_errors = []
+        # Multi-label check
+        for i, prob in enumerate(preds):
+            if prob > self.CONFIDENCE_THRESHOLD:
+                error_name = self.LABELS[i] # hips_sagging or hips_piking
+                active_errors.append(error_name)
+
+        if not active_errors:
+            self.report_stats.add_form_score(1.0)
+            if self.counter > 0 and self.feedback == "Good push!":
+                 pass # Keep positive feedback
+            elif self.stage == "down":
+                 self.feedback = "Push Up!"
+            else:
+                 self.feedback = "Good Form"
+
+        else:
+            self.report_stats.add_form_score(0.0, [error.replace("_", " ").title() for error in active_errors])
+            # Feedback based on error
+            if "hips_sagging" in active_errors:
+                self.feedback = "Lift Hips!"
+            elif "hips_piking" in active_errors:
+                self.feedback = "Lower Hips!"
+
+    def _process_squats(self, angles_3d, valid):
+        if valid[LEFT_KNEE]:
+            angle = angles_3d[LEFT_KNEE]
             if angle > 160: self.stage = "up"
             if angle < 95 and self.stage == 'up':
                 self.stage = "down"
                 self.counter += 1
                 self.feedback = "Good Squat!" 
-                self.form_scores.append(1.0) 
+                self.report_stats.add_form_score(1.0)
+                self.report_stats.end_rep()
 
-    def _process_jumping_jacks(self, landmarks):
-        l_ankle = landmarks.get('27')
-        r_ankle = landmarks.get('28')
-        l_wrist = landmarks.get('15')
-        r_wrist = landmarks.get('16')
-        nose = landmarks.get('0')
-        if l_ankle and r_ankle and l_wrist and r_wrist and nose:
-            feet_dist = abs(l_ankle['x'] - r_ankle['x'])
-            hands_up = l_wrist['y'] < nose['y'] and r_wrist['y'] < nose['y']
-            hands_down = l_wrist['y'] > nose['y'] and r_wrist['y'] > nose['y']
+    def _process_jumping_jacks(self, points, present):
+        # nose, wrists, ankles
+        if present[[0, 15, 16, 27, 28]].all():
+            nose_y = points[0, 1]
+            l_wrist_y, r_wrist_y = points[15, 1], points[16, 1]
+            feet_dist = abs(points[27, 0] - points[28, 0])
+            hands_up = l_wrist_y < nose_y and r_wrist_y < nose_y
+            hands_down = l_wrist_y > nose_y and r_wrist_y > nose_y
             if feet_dist > 0.3 and hands_up:
                 self.stage = "out"
                 self.feedback = "In!"
@@ -265,4 +288,5 @@ class ExerciseDetector:
                 self.stage = "in"
                 self.counter += 1
                 self.feedback = "Good Jack!"
-                self.form_scores.append(1.0)
+                self.report_stats.add_form_score(1.0)
+                self.report_stats.end_rep()
@@ -0,0 +1,56 @@
+"""Export pushup_fusion_model.keras weights to pushup_fusion_model.npz for the
+TensorFlow-free NumPy serving backend (FUSION_MODEL_BACKEND=numpy), then check
+that NumpyFusionModel reproduces the Keras outputs.
+
+Usage: python export_numpy_weights.py [--windows recorded_windows.npz] [--atol 1e-4]
+"""
+import argparse
+import numpy as np
+import tensorflow as tf
+from fusion_model import MODEL_PATH, MODEL_FILES, WINDOW_SIZE, NUM_KEYPOINT_FEATURES, NUM_ANGLE_FEATURES, NumpyFusionModel
+
+def export(model, path):
+    expected = set(NumpyFusionModel.KEYPOINT_BRANCH + NumpyFusionModel.ANGLE_BRANCH +
+                   NumpyFusionModel.HEAD + (NumpyFusionModel.OUTPUT,))
+    arrays = {}
+    for layer in model.layers:
+        for i, weight in enumerate(layer.get_weights()):
+            arrays[f"{layer.name}/{i}"] = weight.astype(np.float32)
+
+    missing = expected - {key.split('/')[0] for key in arrays}
+    if missing:
+        raise SystemExit(f"❌ Model does not match the NumPy architecture, missing layers: {sorted(missing)}")
+
+    np.savez_compressed(path, **arrays)
+    return arrays
+
+def verify(model, path, windows, atol):
+    if windows:
+        data = np.load(windows)
+        kp, ang = data['keypoints'].astype(np.float32), data['angles'].astype(np.float32)
+    else:
+        rng = np.random.default_rng(0)
+        kp = (rng.random((128, WINDOW_SIZE, NUM_KEYPOINT_FEATURES)) - 0.5).astype(np.float32)
+        ang = (rng.random((128, WINDOW_SIZE, NUM_ANGLE_FEATURES)) * 180).astype(np.float32)
+
+    expected = model.predict({'keypoints_input': kp, 'angles_input': ang}, verbose=0)
+    actual = NumpyFusionModel(path).infer(kp, ang)
+    max_diff = np.abs(actual - expected).max()
+    if max_diff > atol:
+        raise SystemExit(f"❌ NumPy forward pass differs from Keras by {max_diff:.2e} (atol {atol:.0e})")
+    print(f"✅ NumPy forward pass matches Keras on {len(kp)} windows (max |diff| {max_diff:.2e})")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--windows', help='.npz with keypoints/angles windows to verify on')
+    parser.add_argument('--atol', type=float, default=1e-4)
+    args = parser.parse_args()
+
+    model = tf.keras.models.load_model(MODEL_PATH)
+    path = MODEL_FILES['numpy']
+    arrays = export(model, path)
+    print(f"✅ Wrote {len(arrays)} arrays to {path}")
+    verify(model, path, args.windows, args.atol)
+
+if __name__ == '__main__':
+    main()
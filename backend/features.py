@@ -0,0 +1,71 @@
+import numpy as np
+
+NUM_LANDMARKS = 33
+
+# (a, b, c) landmark triplets, angle measured at b. Order matches the fusion model's angles_input.
+# 1. Elbows: (11,13,15), (12,14,16)
+# 2. Shoulders: (13,11,23), (14,12,24)
+# 3. Hips: (11,23,25), (12,24,26)
+# 4. Knees: (23,25,27), (24,26,28)
+ANGLE_TRIPLETS = np.array([
+    (11, 13, 15), (12, 14, 16),
+    (13, 11, 23), (14, 12, 24),
+    (11, 23, 25), (12, 24, 26),
+    (23, 25, 27), (24, 26, 28)
+])
+
+# Rows of ANGLE_TRIPLETS used by the rep counters
+LEFT_ELBOW = 0
+LEFT_KNEE = 6
+
+_TRIPLET_INDEX = ANGLE_TRIPLETS.reshape(-1)
+_KEYS = [str(i) for i in range(NUM_LANDMARKS)]
+_MISSING = (0.0, 0.0, 0.0, 0.0)
+
+def landmarks_to_array(landmarks):
+    """Convert the JSON landmark map ({'0': {'x', 'y', 'z', 'visibility'}, ...}) into a dense frame.
+
+    Returns (points, present): a (33, 4) float32 array of x, y, z, visibility
+    (zeros for missing landmarks) and a (33,) bool mask of which landmarks were sent.
+    """
+    rows = []
+    present = []
+    for key in _KEYS:
+        lm = landmarks.get(key)
+        if lm:
+            rows.append((lm['x'], lm['y'], lm['z'], lm.get('visibility', 0.0)))
+            present.append(True)
+        else:
+            rows.append(_MISSING)
+            present.append(False)
+    return np.array(rows, dtype=np.float32), np.array(present)
+
+def compute_angles(points, present):
+    """Compute all ANGLE_TRIPLETS angles (degrees) in one pass.
+
+    Returns (angles_2d, angles_3d, valid), each of shape (8,). angles_2d uses
+    the x/y projection (model input), angles_3d the full x/y/z vectors (rep
+    counting). Triplets with a missing landmark get 180 and valid=False.
+    """
+    pts = points.take(_TRIPLET_INDEX, axis=0).reshape(-1, 3, 4)[:, :, :3]
+    seg = pts[:, ::2] - pts[:, 1:2] # (8, 2, 3): b->a and b->c
+
+    # 2D: difference of the two segment headings, folded into [0, 180]
+    heading = np.arctan2(seg[..., 1], seg[..., 0])
+    angles_2d = np.abs(np.degrees(heading[:, 1] - heading[:, 0]))
+    angles_2d = np.minimum(angles_2d, 360.0 - angles_2d)
+
+    # 3D: angle between the two segment vectors
+    sq_norms = (seg * seg).sum(axis=2)
+    cosine = (seg[:, 0] * seg[:, 1]).sum(axis=1) / (np.sqrt(sq_norms[:, 0] * sq_norms[:, 1]) + 1e-6)
+    angles_3d = np.degrees(np.arccos(np.minimum(np.maximum(cosine, -1.0), 1.0)))
+
+    valid = present.take(_TRIPLET_INDEX).reshape(-1, 3).all(axis=1)
+    if not valid.all():
+        angles_2d[~valid] = 180.0
+        angles_3d[~valid] = 180.0
+    return angles_2d, angles_3d, valid
+
+def keypoints_flat(points):
+    """(99,) x/y/z vector for the model's keypoints_input"""
+    return points[:, :3].reshape(-1)
@@ -0,0 +1,47 @@
+import os
+
+# Camera rate the push-up model was trained at
+REFERENCE_FPS = 30
+
+# (max_fps, min_fps) each exercise needs from the client's landmark stream.
+# Push-ups feed a 20-frame model window trained at camera rate, so they stay
+# there: a lower rate would stretch the window over a longer time span than the
+# model has seen, and push-up load is shed through the inference hop instead.
+# Squats and jumping jacks are counted from coarse angle thresholds and are fine
+# at a fraction of it.
+EXERCISE_RATES = {
+    'Push-ups': (REFERENCE_FPS, REFERENCE_FPS),
+    'Squats': (20, 10),
+    'Jumping Jacks': (15, 8)
+}
+# Before Start only visibility feedback is computed
+IDLE_RATE = (10, 5)
+
+class FrameRatePolicy:
+    """Decides the landmark send rate the server asks each client for.
+
+    The rate starts at the exercise's max_fps and slides towards min_fps as
+    inference load (AdaptiveHop.load, sampled from the batch engine) goes from
+    LOW_LOAD to HIGH_LOAD. CLIENT_FPS_BUDGET optionally caps the total frames
+    per second this process accepts, split evenly across connected sessions.
+    """
+
+    LOW_LOAD = 0.3
+    HIGH_LOAD = 0.9
+
+    def __init__(self, hop=None, budget=None):
+        self.hop = hop
+        self.budget = float(budget or os.getenv('CLIENT_FPS_BUDGET', 0))
+
+    def pressure(self):
+        if self.hop is None:
+            return 0.0
+        pressure = (self.hop.load - self.LOW_LOAD) / (self.HIGH_LOAD - self.LOW_LOAD)
+        return min(1.0, max(0.0, pressure))
+
+    def target(self, exercise_type, active, session_count=1):
+        max_fps, min_fps = EXERCISE_RATES.get(exercise_type, IDLE_RATE) if active else IDLE_RATE
+        fps = max_fps - (max_fps - min_fps) * self.pressure()
+        if self.budget and session_count:
+            fps = min(fps, max(min_fps, self.budget / session_count))
+        return int(round(fps))
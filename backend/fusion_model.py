@@ -0,0 +1,253 @@
+import os
+import threading
+import numpy as np
+
+# TensorFlow is imported inside the loader, never at module level: API-only
+# workers import the detector stack without paying for the TF runtime.
+MODEL_PATH = os.path.join(os.path.dirname(__file__), 'pushup_fusion_model.keras')
+
+# Serving backend (FUSION_MODEL_BACKEND) -> model file. TFLite files are produced by
+# convert_tflite.py, the .npz weights by export_numpy_weights.py.
+MODEL_FILES = {
+    'keras': MODEL_PATH,
+    'tflite-fp16': os.path.join(os.path.dirname(__file__), 'pushup_fusion_model_fp16.tflite'),
+    'tflite-int8': os.path.join(os.path.dirname(__file__), 'pushup_fusion_model_int8.tflite'),
+    'numpy': os.path.join(os.path.dirname(__file__), 'pushup_fusion_model.npz')
+}
+
+WINDOW_SIZE = 20
+NUM_KEYPOINT_FEATURES = 99 # 33 landmarks * (x, y, z)
+NUM_ANGLE_FEATURES = 8
+
+# Batch shapes the TFLite interpreter is allocated for; smaller batches are
+# zero-padded up to the next one so allocate_tensors() runs once per bucket.
+TFLITE_BATCH_BUCKETS = (1, 4, 8, 16, 32)
+
+class KerasFusionModel:
+    """Serves the Keras fusion model through a pre-traced tf.function.
+
+    Model.predict() builds a data adapter and runs callbacks on every call,
+    which dominates the cost of a single 20-frame window. The traced function
+    has fixed input signatures with a free batch dimension, so it is traced
+    once (during warm_up, not on a live user's frame) and reused for every
+    batch size.
+    """
+
+    def __init__(self, keras_model):
+        import tensorflow as tf
+        self.keras_model = keras_model
+
+        @tf.function(input_signature=[
+            tf.TensorSpec([None, WINDOW_SIZE, NUM_KEYPOINT_FEATURES], tf.float32, name='keypoints_input'),
+            tf.TensorSpec([None, WINDOW_SIZE, NUM_ANGLE_FEATURES], tf.float32, name='angles_input')
+        ])
+        def serve(input_kp, input_ang):
+            return keras_model({'keypoints_input': input_kp, 'angles_input': input_ang}, training=False)
+
+        self._serve = serve
+
+    def warm_up(self, batch_sizes=(1, 8)):
+        for batch_size in batch_sizes:
+            self.infer(np.zeros((batch_size, WINDOW_SIZE, NUM_KEYPOINT_FEATURES), dtype=np.float32),
+                       np.zeros((batch_size, WINDOW_SIZE, NUM_ANGLE_FEATURES), dtype=np.float32))
+
+    def infer(self, input_kp, input_ang):
+        """(batch, WINDOW_SIZE, 99) + (batch, WINDOW_SIZE, 8) float32 -> (batch, 2) probabilities"""
+        return self._serve(input_kp, input_ang).numpy()
+
+class TFLiteFusionModel:
+    """Serves a converted fusion model with the TFLite interpreter (CPU-only nodes).
+
+    Uses the standalone LiteRT (ai_edge_litert) or tflite_runtime package when
+    installed, so serving does not need full TensorFlow; falls back to tf.lite.
+    Resizing and re-allocating tensors on every batch size change costs more than
+    the model itself, so each size in TFLITE_BATCH_BUCKETS gets its own
+    interpreter, allocated once, and batches are zero-padded up to the next
+    bucket. Interpreters are not thread-safe, calls are serialized.
+    """
+
+    def __init__(self, model_path):
+        try:
+            from ai_edge_litert.interpreter import Interpreter
+        except ImportError:
+            try:
+                from tflite_runtime.interpreter import Interpreter
+            except ImportError:
+                import tensorflow as tf
+                Interpreter = tf.lite.Interpreter
+
+        self.model_path = model_path
+        self._Interpreter = Interpreter
+        self._interpreters = {}
+        self._lock = threading.Lock()
+
+    def _interpreter(self, batch_size):
+        interpreter = self._interpreters.get(batch_size)
+        if interpreter is None:
+            interpreter = self._Interpreter(model_path=self.model_path)
+            inputs = interpreter.get_input_details()
+            kp_index = next(d['index'] for d in inputs if 'keypoints' in d['name'])
+            ang_index = next(d['index'] for d in inputs if 'angles' in d['name'])
+            interpreter.resize_tensor_input(kp_index, [batch_size, WINDOW_SIZE, NUM_KEYPOINT_FEATURES])
+            interpreter.resize_tensor_input(ang_index, [batch_size, WINDOW_SIZE, NUM_ANGLE_FEATURES])
+            interpreter.allocate_tensors()
+            interpreter = (interpreter, kp_index, ang_index, interpreter.get_output_details()[0]['index'])
+            self._interpreters[batch_size] = interpreter
+        return interpreter
+
+    def warm_up(self, batch_sizes=TFLITE_BATCH_BUCKETS):
+        for batch_size in batch_sizes:
+            self.infer(np.zeros((batch_size, WINDOW_SIZE, NUM_KEYPOINT_FEATURES), dtype=np.float32),
+                       np.zeros((batch_size, WINDOW_SIZE, NUM_ANGLE_FEATURES), dtype=np.float32))
+
+    def infer(self, input_kp, input_ang):
+        """Same contract as KerasFusionModel.infer"""
+        input_kp = np.ascontiguousarray(input_kp, dtype=np.float32)
+        input_ang = np.ascontiguousarray(input_ang, dtype=np.float32)
+        largest = TFLITE_BATCH_BUCKETS[-1]
+        if input_kp.shape[0] > largest:
+            return np.concatenate([self.infer(input_kp[i:i + largest], input_ang[i:i + largest])
+                                   for i in range(0, input_kp.shape[0], largest)])
+
+        batch_size = input_kp.shape[0]
+        bucket = next(size for size in TFLITE_BATCH_BUCKETS if size >= batch_size)
+        if bucket != batch_size:
+            padding = bucket - batch_size
+            input_kp = np.concatenate([input_kp, np.zeros((padding,) + input_kp.shape[1:], dtype=np.float32)])
+            input_ang = np.concatenate([input_ang, np.zeros((padding,) + input_ang.shape[1:], dtype=np.float32)])
+
+        with self._lock:
+            interpreter, kp_index, ang_index, output_index = self._interpreter(bucket)
+            interpreter.set_tensor(kp_index, input_kp)
+            interpreter.set_tensor(ang_index, input_ang)
+            interpreter.invoke()
+            return interpreter.get_tensor(output_index)[:batch_size].copy()
+
+def _sigmoid(x):
+    # exp of a non-positive argument only, so large logits of either sign cannot overflow
+    e = np.exp(-np.abs(x))
+    return np.where(x >= 0, 1.0 / (1.0 + e), e / (1.0 + e)).astype(np.float32, copy=False)
+
+class NumpyFusionModel:
+    """Pure-NumPy forward pass of the fusion model, no TensorFlow at all.
+
+    Reproduces the network inspect_model.py prints:
+      keypoints (20, 99) -> Conv1D(64, 3, same, relu) -> MaxPool(2) -> LSTM(64, seq) -> LSTM(32)
+      angles    (20, 8)  -> Conv1D(32, 3, same, relu) -> MaxPool(2) -> LSTM(32, seq) -> LSTM(16)
+      concat(48) -> Dense(64, relu) -> Dense(32, relu) -> Dense(2, sigmoid)
+    Dropout layers are identity at inference. Weights come from the .npz
+    written by export_numpy_weights.py, keyed '<layer>/<index>' in Keras order.
+    """
+
+    KEYPOINT_BRANCH = ('conv1d', 'lstm', 'lstm_1')
+    ANGLE_BRANCH = ('conv1d_1', 'lstm_2', 'lstm_3')
+    HEAD = ('dense', 'dense_1')
+    OUTPUT = 'dense_2'
+
+    def __init__(self, weights_path):
+        with np.load(weights_path) as data:
+            self.weights = {key: data[key].astype(np.float32) for key in data.files}
+
+    def _w(self, layer):
+        return [self.weights[f"{layer}/{i}"] for i in range(3) if f"{layer}/{i}" in self.weights]
+
+    @staticmethod
+    def _conv1d_same_relu(x, kernel, bias):
+        width = kernel.shape[0]
+        pad = (width - 1) // 2
+        padded = np.pad(x, ((0, 0), (pad, width - 1 - pad), (0, 0)))
+        steps = x.shape[1]
+        out = bias + sum(padded[:, k:k + steps] @ kernel[k] for k in range(width))
+        return np.maximum(out, 0.0)
+
+    @staticmethod
+    def _max_pool(x, size=2):
+        steps = x.shape[1] // size * size
+        return x[:, :steps].reshape(x.shape[0], steps // size, size, x.shape[2]).max(axis=2)
+
+    @staticmethod
+    def _lstm(x, kernel, recurrent, bias, return_sequences):
+        batch, steps, _ = x.shape
+        units = recurrent.shape[0]
+        # Input projection for all steps at once, gates in Keras order i, f, c, o
+        projected = x @ kernel + bias
+        h = np.zeros((batch, units), dtype=np.float32)
+        c = np.zeros((batch, units), dtype=np.float32)
+        outputs = []
+        for t in range(steps):
+            z = projected[:, t] + h @ recurrent
+            i = _sigmoid(z[:, :units])
+            f = _sigmoid(z[:, units:2 * units])
+            g = np.tanh(z[:, 2 * units:3 * units])
+            o = _sigmoid(z[:, 3 * units:])
+            c = f * c + i * g
+            h = o * np.tanh(c)
+            if return_sequences:
+                outputs.append(h)
+        return np.stack(outputs, axis=1) if return_sequences else h
+
+    def _branch(self, x, names):
+        conv, lstm_seq, lstm_last = names
+        x = self._max_pool(self._conv1d_same_relu(x, *self._w(conv)))
+        x = self._lstm(x, *self._w(lstm_seq), return_sequences=True)
+        return self._lstm(x, *self._w(lstm_last), return_sequences=False)
+
+    def warm_up(self, batch_sizes=(1,)):
+        for batch_size in batch_sizes:
+            self.infer(np.zeros((batch_size, WINDOW_SIZE, NUM_KEYPOINT_FEATURES), dtype=np.float32),
+                       np.zeros((batch_size, WINDOW_SIZE, NUM_ANGLE_FEATURES), dtype=np.float32))
+
+    def infer(self, input_kp, input_ang):
+        """Same contract as KerasFusionModel.infer"""
+        input_kp = np.asarray(input_kp, dtype=np.float32)
+        input_ang = np.asarray(input_ang, dtype=np.float32)
+        x = np.concatenate([self._branch(input_kp, self.KEYPOINT_BRANCH),
+                            self._branch(input_ang, self.ANGLE_BRANCH)], axis=1)
+        for layer in self.HEAD:
+            kernel, bias = self._w(layer)
+            x = np.maximum(x @ kernel + bias, 0.0)
+        kernel, bias = self._w(self.OUTPUT)
+        return _sigmoid(x @ kernel + bias)
+
+# One model per process, shared by every detector session
+_shared_model = None
+_model_loaded = False
+_model_lock = threading.Lock()
+
+def get_shared_model():
+    """Load (and warm) the fusion model on first use and hand the same instance to every caller"""
+    global _shared_model, _model_loaded
+    if not _model_loaded:
+        with _model_lock:
+            if not _model_loaded:
+                _shared_model = load_fusion_model(os.getenv('FUSION_MODEL_BACKEND', 'keras'))
+                _model_loaded = True
+    return _shared_model
+
+def is_model_loaded():
+    return _model_loaded
+
+def load_fusion_model(backend='keras'):
+    """Load and warm a fresh model for the given backend, or None if it is unavailable"""
+    model_path = MODEL_FILES.get(backend)
+    if model_path is None:
+        print(f"❌ Unknown model backend '{backend}' (expected one of {', '.join(MODEL_FILES)})")
+        return None
+
+    try:
+        if os.path.exists(model_path):
+            if backend == 'keras':
+                import tensorflow as tf
+                model = KerasFusionModel(tf.keras.models.load_model(model_path))
+            elif backend == 'numpy':
+                model = NumpyFusionModel(model_path)
+            else:
+                model = TFLiteFusionModel(model_path)
+            model.warm_up()
+            print(f"✅ Fusion model loaded and warmed up ({backend})")
+            return model
+        else:
+            print(f"❌ Model not found at {model_path}")
+    except Exception as e:
+        print(f"❌ Error loading model: {e}")
+    return None
@@ -0,0 +1,257 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+def make_inference_runner(kind=None, workers=None):
+    """Build runner(fn, *args) that executes model calls off the socket event loop.
+
+    kind (INFERENCE_POOL):
+      'tpool'  - eventlet's native thread pool; the calling green thread yields
+                 while TensorFlow runs, so the hub keeps serving HTTP and sockets
+      'thread' - a dedicated ThreadPoolExecutor (threading async mode)
+      'inline' - call directly in the caller (debugging)
+    workers (INFERENCE_WORKERS) sizes the pool.
+    """
+    kind = kind or os.getenv('INFERENCE_POOL', 'thread')
+    workers = int(workers or os.getenv('INFERENCE_WORKERS', 2))
+
+    if kind == 'tpool':
+        from eventlet import tpool
+        tpool.set_num_threads(workers)
+        return tpool.execute
+
+    if kind == 'thread':
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='inference')
+        return lambda fn, *args: executor.submit(fn, *args).result()
+
+    if kind == 'inline':
+        return lambda fn, *args: fn(*args)
+
+    raise ValueError(f"Unknown inference pool '{kind}'")
+
+class BatchInferenceEngine:
+    """Micro-batches push-up windows from all live sessions into one model call.
+
+    Sessions submit a ready (WINDOW_SIZE, 99) keypoint window and (WINDOW_SIZE, 8)
+    angle window together with a callback. A background loop waits until either
+    max_batch windows are queued or the oldest one has waited max_wait_ms, runs
+    them through the fusion model as a single batch and hands every session its
+    own row of predictions.
+
+    Each session has at most one window waiting: if a session submits again
+    before its previous window ran (inference is falling behind), the newer
+    window replaces the stale one. Queue length, and with it latency, stays
+    bounded by the number of live sessions instead of growing with backlog.
+
+    The model call itself goes through `runner` (see make_inference_runner) and,
+    when `spawn` is given, up to max_in_flight batches run concurrently in
+    background tasks. A session never has two windows in flight at once, so its
+    results arrive in order.
+    """
+
+    # Longest the idle loop sleeps without a wake-up, only a safety net
+    IDLE_WAIT = 1.0
+
+    def __init__(self, model_loader, max_batch=None, max_wait_ms=None, sleep=time.sleep,
+                 runner=None, spawn=None, max_in_flight=None, event=None):
+        # Called on the worker the first time a batch runs, so a lazy model load
+        # happens off the event loop too
+        self.model_loader = model_loader
+        self.max_batch = int(max_batch or os.getenv('INFERENCE_MAX_BATCH', 32))
+        self.max_wait = float(max_wait_ms or os.getenv('INFERENCE_MAX_WAIT_MS', 5)) / 1000.0
+        # socketio.sleep under eventlet so the loop yields to other green threads
+        self.sleep = sleep
+        # Set by submit() and by finished batches; the loop waits on it instead of polling
+        # while nothing is runnable (a green Event under eventlet, socketio.server.eio.create_event())
+        self._wake = event or threading.Event()
+        self.runner = runner or (lambda fn, *args: fn(*args))
+        self.spawn = spawn
+        self.max_in_flight = int(max_in_flight or os.getenv('INFERENCE_WORKERS', 2)) if spawn else 1
+
+        self._pending = OrderedDict() # session key -> (enqueued_at, kp, ang, callback)
+        self._busy = set() # Session keys with a window currently in flight
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._running = False
+
+        # Metrics
+        self.batches_run = 0
+        self.windows_run = 0
+        self.windows_dropped = 0
+        self._busy_seconds = 0.0
+        self._utilization_mark = (time.monotonic(), 0.0)
+
+    def submit(self, key, kp_window, ang_window, callback):
+        """Queue a window for `key` (one per session). Returns True if it replaced a stale one."""
+        # Copy now: the session keeps sliding its window while this one waits
+        kp = np.array(kp_window, dtype=np.float32)
+        ang = np.array(ang_window, dtype=np.float32)
+        with self._lock:
+            stale = self._pending.get(key)
+            if stale is not None:
+                # Latest frame wins, but keep the original queue slot and age
+                self._pending[key] = (stale[0], kp, ang, callback)
+                self.windows_dropped += 1
+                return True
+            self._pending[key] = (time.monotonic(), kp, ang, callback)
+        self._wake.set()
+        return False
+
+    def discard(self, key):
+        with self._lock:
+            self._pending.pop(key, None)
+
+    def pending(self):
+        return len(self._pending)
+
+    def run_forever(self):
+        self._running = True
+        while self._running:
+            with self._lock:
+                queued = len(self._pending)
+                oldest = next(iter(self._pending.values()))[0] if queued else None
+                saturated = self._in_flight >= self.max_in_flight
+
+            if not queued or saturated:
+                self._idle()
+                continue
+
+            waited = time.monotonic() - oldest
+            if queued < self.max_batch and waited < self.max_wait:
+                self.sleep(self.max_wait - waited)
+                continue
+
+            batch = self._take_batch()
+            if not batch:
+                self._idle() # Everything queued belongs to sessions already in flight
+            elif self.spawn:
+                self.spawn(self._run_batch, batch)
+            else:
+                self._run_batch(batch)
+
+    def _idle(self):
+        # Polling only happens while windows wait out max_wait; otherwise sleep until woken
+        self._wake.wait(self.IDLE_WAIT)
+        self._wake.clear()
+
+    def stop(self):
+        self._running = False
+        self._wake.set()
+
+    def utilization(self):
+        """Fraction of worker capacity spent in model calls since the previous call (0..1+)"""
+        now = time.monotonic()
+        with self._lock:
+            busy = self._busy_seconds
+            backlog = len(self._pending)
+        last_time, last_busy = self._utilization_mark
+        self._utilization_mark = (now, busy)
+        elapsed = now - last_time
+        if elapsed <= 0:
+            return 0.0
+        load = (busy - last_busy) / (elapsed * self.max_in_flight)
+        # Windows still waiting beyond one full batch mean we are behind regardless
+        if backlog > self.max_batch:
+            load = max(load, 1.0)
+        return load
+
+    def flush(self):
+        """Run up to max_batch queued windows through the model now. Returns how many ran."""
+        batch = self._take_batch()
+        if not batch:
+            return 0
+        return self._run_batch(batch)
+
+    def _take_batch(self):
+        with self._lock:
+            keys = [key for key in self._pending if key not in self._busy][:self.max_batch]
+            batch = [(key, self._pending.pop(key)) for key in keys]
+            if batch:
+                self._busy.update(keys)
+                self._in_flight += 1
+        return batch
+
+    def _predict(self, input_kp, input_ang):
+        model = self.model_loader()
+        if model is None:
+            return None
+        return model.infer(input_kp, input_ang)
+
+    def _run_batch(self, batch):
+        input_kp = np.stack([item[1] for _, item in batch])
+        input_ang = np.stack([item[2] for _, item in batch])
+
+        started = time.monotonic()
+        try:
+            preds = self.runner(self._predict, input_kp, input_ang)
+        except Exception as e:
+            print(f"❌ Batch inference error: {e}")
+            return 0
+        finally:
+            with self._lock:
+                self._busy_seconds += time.monotonic() - started
+                self._busy.difference_update(key for key, _ in batch)
+                self._in_flight -= 1
+            self._wake.set()
+
+        if preds is None:
+            return 0 # Model unavailable, sessions keep their last feedback
+
+        self.batches_run += 1
+        self.windows_run += len(batch)
+
+        for (_, item), row in zip(batch, preds):
+            try:
+                item[3](row)
+            except Exception as e:
+                print(f"❌ Error delivering inference result: {e}")
+
+        return len(batch)
+
+
+class AdaptiveHop:
+    """How often each session runs the model on its sliding window.
+
+    Consecutive windows overlap by WINDOW_SIZE - 1 frames, so inferring on every
+    frame mostly re-scores the same motion. A session infers only when at least
+    `hop` frames and `min_interval_ms` have passed since its last inference.
+    With adaptive=True, update() widens the hop (up to max_hop) while the
+    engine is saturated and narrows it back towards min_hop when load is light,
+    so form feedback degrades gracefully instead of the server falling behind.
+    """
+
+    HIGH_LOAD = 0.8
+    LOW_LOAD = 0.3
+
+    def __init__(self, min_hop=None, max_hop=None, min_interval_ms=None, adaptive=None):
+        self.min_hop = int(min_hop or os.getenv('INFERENCE_HOP', 1))
+        self.max_hop = max(self.min_hop, int(max_hop or os.getenv('INFERENCE_MAX_HOP', 8)))
+        self.min_interval = float(min_interval_ms or os.getenv('INFERENCE_MIN_INTERVAL_MS', 0)) / 1000.0
+        if adaptive is None:
+            adaptive = os.getenv('INFERENCE_ADAPTIVE_HOP', '1') == '1'
+        self.adaptive = adaptive
+        self.hop = self.min_hop
+        self.load = 0.0 # Last sampled engine utilization, also read by frame_rate.FrameRatePolicy
+
+    def update(self, load):
+        self.load = load
+        if not self.adaptive:
+            return self.hop
+        if load > self.HIGH_LOAD and self.hop < self.max_hop:
+            self.hop += 1
+            print(f"Inference load {load:.2f}, hop widened to {self.hop} frames")
+        elif load < self.LOW_LOAD and self.hop > self.min_hop:
+            self.hop -= 1
+        return self.hop
+
+    def due(self, frames_since, seconds_since):
+        return frames_since >= self.hop and seconds_since >= self.min_interval
+
+    def run_forever(self, engine, sleep=time.sleep, interval=1.0):
+        """Resample engine load every `interval` seconds"""
+        while True:
+            sleep(interval)
+            self.update(engine.utilization())
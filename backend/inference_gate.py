@@ -0,0 +1,47 @@
+import os
+import numpy as np
+
+# Shoulders and hips: the landmarks the hips_sagging / hips_piking labels depend on
+GATE_LANDMARKS = [11, 12, 23, 24]
+
+class InferenceGate:
+    """Cheap pre-check that decides whether a full push-up window is worth a model call.
+
+    check() returns:
+      'skip'  - a shoulder or hip is not visible enough, the prediction would be noise
+      'reuse' - the body barely moved since the last inferred frame, the previous
+                prediction still holds
+      'run'   - run the model
+    Counters for each outcome show how much inference compute is saved.
+    """
+
+    def __init__(self, min_visibility=None, motion_threshold=None):
+        self.min_visibility = float(min_visibility or os.getenv('INFERENCE_MIN_VISIBILITY', 0.5))
+        # Mean per-landmark displacement (hip-normalized units) since the last inferred frame
+        self.motion_threshold = float(motion_threshold or os.getenv('INFERENCE_MOTION_THRESHOLD', 0.01))
+        self.reset()
+
+    def reset(self):
+        self.last_points = None
+        self.executed = 0
+        self.reused = 0
+        self.skipped = 0
+
+    def check(self, points, present, can_reuse):
+        visible = present[GATE_LANDMARKS].all() and (points[GATE_LANDMARKS, 3] >= self.min_visibility).all()
+        if not visible:
+            self.skipped += 1
+            return 'skip'
+
+        if can_reuse and self.last_points is not None:
+            motion = np.linalg.norm(points[:, :3] - self.last_points, axis=1).mean()
+            if motion < self.motion_threshold:
+                self.reused += 1
+                return 'reuse'
+
+        self.executed += 1
+        self.last_points = np.array(points[:, :3])
+        return 'run'
+
+    def stats(self):
+        return {"executed": self.executed, "reused": self.reused, "skipped": self.skipped}
@@ -0,0 +1,130 @@
+import os
+import time
+import uuid
+import threading
+from collections import deque
+
+class JobMetrics:
+    """Counters and recent timings for sizing a worker pool.
+
+    Keeps the last `window` jobs' queue wait and run time; snapshot() reports
+    current depth, totals and p50/p95 over that window.
+    """
+
+    def __init__(self, window=200):
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.wait_seconds = deque(maxlen=window)
+        self.run_seconds = deque(maxlen=window)
+
+    def record(self, job):
+        if job['status'] == 'done':
+            self.completed += 1
+        else:
+            self.failed += 1
+        started = job['startedAt'] or job['finishedAt']
+        self.wait_seconds.append(started - job['createdAt'])
+        self.run_seconds.append(job['finishedAt'] - started)
+
+    @staticmethod
+    def _percentiles(samples):
+        if not samples:
+            return {"p50": None, "p95": None}
+        ordered = sorted(samples)
+        pick = lambda q: round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 3)
+        return {"p50": pick(0.5), "p95": pick(0.95)}
+
+    def snapshot(self, queued, running):
+        return {
+            "queued": queued,
+            "running": running,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "waitSeconds": self._percentiles(self.wait_seconds),
+            "runSeconds": self._percentiles(self.run_seconds)
+        }
+
+class JobQueue:
+    """Tracks background jobs running on a pool (VideoAnalyzer, MediaProcessor).
+
+    worker.submit(*args) must return a concurrent.futures.Future. submit() returns
+    a job id straight away. A green watcher (spawn) polls the future with sleep(),
+    so waiting never ties up an HTTP worker or a native thread, and calls
+    on_complete(job, context) once the work has finished or failed. Finished
+    jobs stay queryable for JOB_TTL seconds.
+    """
+
+    def __init__(self, worker, spawn, sleep=time.sleep, on_complete=None, poll_interval=None, ttl=None, kind='analysis'):
+        self.worker = worker
+        self.kind = kind
+        self.spawn = spawn
+        self.sleep = sleep
+        self.on_complete = on_complete
+        self.poll_interval = float(poll_interval or os.getenv('JOB_POLL_INTERVAL', 0.25))
+        self.ttl = float(ttl or os.getenv('JOB_TTL', 3600))
+        self.metrics = JobMetrics()
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, *args, context=None, **fields):
+        """Queue worker.submit(*args); context is kept for on_complete, fields go on the public job record"""
+        job = dict(fields, **{
+            "id": uuid.uuid4().hex,
+            "kind": self.kind,
+            "status": "queued",
+            "createdAt": time.time(),
+            "startedAt": None,
+            "finishedAt": None,
+            "result": None,
+            "error": None
+        })
+        future = self.worker.submit(*args)
+        with self._lock:
+            self._prune(job['createdAt'])
+            self._jobs[job['id']] = (job, context)
+            self.metrics.submitted += 1
+        self.spawn(self._watch, job, future, context or {})
+        return job['id']
+
+    def _watch(self, job, future, context):
+        while not future.done():
+            if job['status'] == 'queued' and future.running():
+                job['status'] = 'running'
+                job['startedAt'] = time.time()
+            self.sleep(self.poll_interval)
+
+        try:
+            job['result'] = future.result()
+            job['status'] = 'done'
+        except Exception as e:
+            job['error'] = str(e) or type(e).__name__
+            job['status'] = 'failed'
+            print(f"❌ {self.kind.capitalize()} job {job['id']} failed: {job['error']}")
+        job['finishedAt'] = time.time()
+
+        with self._lock:
+            self.metrics.record(job)
+        if self.on_complete:
+            try:
+                self.on_complete(job, context)
+            except Exception as e:
+                print(f"❌ {self.kind.capitalize()} job {job['id']} completion handler error: {e}")
+
+    def _prune(self, now):
+        expired = [job_id for job_id, (job, _) in self._jobs.items()
+                   if job['finishedAt'] and now - job['finishedAt'] > self.ttl]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def get(self, job_id):
+        """Public view of a job (no context), or None if unknown or expired"""
+        with self._lock:
+            entry = self._jobs.get(job_id)
+        return dict(entry[0]) if entry else None
+
+    def stats(self):
+        with self._lock:
+            statuses = [job['status'] for job, _ in self._jobs.values()]
+            return self.metrics.snapshot(statuses.count('queued'), statuses.count('running'))
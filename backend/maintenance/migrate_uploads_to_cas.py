@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Move legacy flat uploads (uploads/<user>_<timestamp>_<name>.webm) into the
+content-addressed store (uploads/cas/ab/cd/<sha256>.webm) and point
+exercise_sessions.video_path at them. Identical recordings collapse into one
+file. Landmark sidecars move with their video, so the pose cache survives;
+derived media (rendition, poster, strip) is regenerated on the next transcode,
+so it is simply removed with the old file.
+
+Usage: python maintenance/migrate_uploads_to_cas.py [--dry-run]
+"""
+import sys
+import os
+import argparse
+
+# Add parent directory to path to allow importing db
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+os.chdir(BACKEND_DIR) # Upload paths are relative to backend/
+
+from db import get_db_connection
+from storage import ContentStore
+from media import derived_paths
+from video_analysis import sidecar_path
+
+UPLOAD_FOLDER = 'uploads'
+
+def migrate(dry_run):
+    conn = get_db_connection()
+    if not conn:
+        print("❌ Failed to connect to database!")
+        return
+
+    store = ContentStore(UPLOAD_FOLDER)
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute("SELECT DISTINCT video_path FROM exercise_sessions WHERE video_path IS NOT NULL AND video_path NOT LIKE 'cas/%'")
+        legacy_paths = [row['video_path'] for row in cursor.fetchall()]
+
+        moved = 0
+        for legacy_path in legacy_paths:
+            file_path = store.path(legacy_path)
+            if not os.path.exists(file_path):
+                print(f"Missing file for {legacy_path}, skipped")
+                continue
+            if dry_run:
+                print(f"Would move {legacy_path}")
+                continue
+
+            ext = os.path.splitext(legacy_path)[1].lower() or '.webm'
+            legacy_sidecar = sidecar_path(file_path)
+            stale = derived_paths(file_path).values()
+            staged = store.stage_file(file_path)
+            # Same lock as uploads and deletes, so this can run next to a live server
+            with store.lock():
+                video_path, _ = store.place(staged, ext)
+                cursor.execute("UPDATE exercise_sessions SET video_path = %s, transcoded_path = NULL, "
+                               "thumbnail_path = NULL, preview_path = NULL WHERE video_path = %s",
+                               (video_path, legacy_path))
+                conn.commit()
+
+            # Keep the cached landmarks, unless a duplicate already brought its own
+            new_sidecar = sidecar_path(store.path(video_path))
+            if os.path.exists(legacy_sidecar):
+                if os.path.exists(new_sidecar):
+                    os.remove(legacy_sidecar)
+                else:
+                    os.replace(legacy_sidecar, new_sidecar)
+            for path in stale:
+                if os.path.exists(path):
+                    os.remove(path)
+            print(f"{legacy_path} -> {video_path}")
+            moved += 1
+
+        print(f"✅ Moved {moved} of {len(legacy_paths)} uploads" + (" (dry run)" if dry_run else ""))
+    finally:
+        cursor.close()
+        conn.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dry-run', action='store_true', help="list what would move without touching anything")
+    args = parser.parse_args()
+    migrate(args.dry_run)
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Re-score every stored upload with the current model.
+
+Uploads analyzed before have a landmark sidecar (<video>.pose-v2.npy), so only
+the counting/form logic runs again; videos without one are decoded once and
+get a sidecar for next time.
+
+Usage: python maintenance/rescore_uploads.py [--dry-run] [--backend numpy|keras|tflite-fp16|tflite-int8]
+"""
+import sys
+import os
+import argparse
+import time
+
+# Add parent directory to path to allow importing db
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+os.chdir(BACKEND_DIR) # Model and upload paths are relative to backend/
+
+from db import get_db_connection
+from exercise_detector import ExerciseDetector
+from fusion_model import load_fusion_model
+from video_analysis import load_sidecar
+
+UPLOAD_FOLDER = 'uploads'
+
+def rescore(backend, dry_run):
+    conn = get_db_connection()
+    if not conn:
+        print("❌ Failed to connect to database!")
+        return
+
+    model = load_fusion_model(backend)
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute("SELECT id, exercise_type, reps, accuracy, video_path FROM exercise_sessions WHERE video_path IS NOT NULL")
+        sessions = cursor.fetchall()
+
+        start = time.perf_counter()
+        rescored = cached = 0
+        for session in sessions:
+            video_path = os.path.join(UPLOAD_FOLDER, session['video_path'])
+            has_sidecar = load_sidecar(video_path) is not None
+            if not has_sidecar and not os.path.exists(video_path):
+                continue # Evicted before it was ever analyzed
+            if has_sidecar:
+                cached += 1
+
+            try:
+                result = ExerciseDetector(model=model, model_loader=None).process_video(video_path, session['exercise_type'])
+            except Exception as e:
+                print(f"❌ Session {session['id']}: {e}")
+                continue
+            if not result['framesAnalyzed']:
+                continue
+
+            reps, accuracy = result['reps'], result['report']['score']
+            print(f"Session {session['id']} ({session['exercise_type']}): "
+                  f"reps {session['reps']} -> {reps}, accuracy {session['accuracy']} -> {accuracy}")
+            if not dry_run:
+                cursor.execute("UPDATE exercise_sessions SET reps = %s, accuracy = %s WHERE id = %s",
+                               (reps, accuracy, session['id']))
+            rescored += 1
+
+        if not dry_run:
+            conn.commit()
+        print(f"✅ Rescored {rescored} sessions ({cached} from sidecars) in {time.perf_counter() - start:.1f}s"
+              + (" (dry run, nothing saved)" if dry_run else ""))
+    finally:
+        cursor.close()
+        conn.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dry-run', action='store_true', help="print the new scores without saving them")
+    parser.add_argument('--backend', default=os.getenv('VIDEO_MODEL_BACKEND', 'numpy'))
+    args = parser.parse_args()
+    rescore(args.backend, args.dry_run)
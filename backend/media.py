@@ -0,0 +1,90 @@
+import os
+import shutil
+import subprocess
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+# Derived files sit next to the upload in uploads/ so /uploads/<filename> serves them:
+#   <stem>.preview.mp4  low-bitrate H.264 rendition for playback in listings
+#   <stem>.poster.jpg   representative frame
+#   <stem>.strip.jpg    the first seconds tiled into one image, for hover previews
+DERIVED_SUFFIXES = {
+    'transcoded_path': '.preview.mp4',
+    'thumbnail_path': '.poster.jpg',
+    'preview_path': '.strip.jpg'
+}
+
+def derived_paths(video_path):
+    """{column: path} of the files derived from an upload"""
+    stem = os.path.splitext(video_path)[0]
+    return {column: stem + suffix for column, suffix in DERIVED_SUFFIXES.items()}
+
+class MediaProcessor:
+    """Transcodes uploads and extracts a poster and preview strip with ffmpeg.
+
+    Each job runs ffmpeg subprocesses, so the pool's threads only wait on them;
+    MEDIA_WORKERS bounds how many ffmpeg processes run at once and
+    MEDIA_FFMPEG_THREADS how many cores each may use, keeping transcoding
+    from starving live inference. Rendition size and quality come from
+    MEDIA_HEIGHT and MEDIA_CRF.
+    """
+
+    def __init__(self, workers=None, ffmpeg=None):
+        self.workers = int(workers or os.getenv('MEDIA_WORKERS', 1))
+        self.ffmpeg = ffmpeg or os.getenv('FFMPEG_BIN') or shutil.which('ffmpeg')
+        self.threads = os.getenv('MEDIA_FFMPEG_THREADS', '2')
+        self.height = int(os.getenv('MEDIA_HEIGHT', 360))
+        self.crf = os.getenv('MEDIA_CRF', '30')
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='media')
+        if self.ffmpeg is None:
+            print("❌ ffmpeg not found, uploads will not be transcoded (set FFMPEG_BIN)")
+
+    def submit(self, video_path):
+        """Future resolving to {column: file name} for the derived files, next to the video"""
+        return self._executor.submit(self.process, video_path)
+
+    def _run(self, args):
+        command = [self.ffmpeg, '-hide_banner', '-loglevel', 'error', '-y', '-threads', self.threads] + args
+        result = subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, timeout=600)
+        if result.returncode != 0:
+            lines = result.stderr.decode(errors='replace').strip().splitlines()
+            raise RuntimeError(lines[-1] if lines else f"ffmpeg exited with {result.returncode}")
+
+    def _encode(self, video_path, args, target):
+        # ffmpeg writes to a hidden temp name (same extension, so the muxer is picked the
+        # same way) that only replaces the target on success: a failed or timed-out encode
+        # never leaves a truncated file that later uploads of this content would reuse
+        directory, name = os.path.split(target)
+        tmp_path = os.path.join(directory, f".{uuid.uuid4().hex}{os.path.splitext(name)[1]}")
+        try:
+            self._run(['-i', video_path] + args + [tmp_path])
+            os.replace(tmp_path, target)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def process(self, video_path):
+        if self.ffmpeg is None:
+            raise RuntimeError("ffmpeg not available")
+
+        targets = derived_paths(video_path)
+        # Never upscale; -2 keeps the width even as libx264 requires
+        scale = f"scale=-2:'min({self.height},ih)'"
+        steps = {
+            'transcoded_path': ['-map', '0:v:0', '-map', '0:a?',
+                                '-vf', scale, '-c:v', 'libx264', '-preset', 'veryfast', '-crf', self.crf,
+                                '-pix_fmt', 'yuv420p', '-c:a', 'aac', '-b:a', '64k', '-movflags', '+faststart'],
+            # thumbnail picks the most representative of the first 100 frames
+            'thumbnail_path': ['-vf', 'thumbnail,scale=320:-2', '-frames:v', '1', '-q:v', '4'],
+            # One frame per second for the first 8 seconds, tiled into a single strip
+            'preview_path': ['-vf', 'fps=1,scale=160:-2,tile=8x1', '-frames:v', '1', '-q:v', '5']
+        }
+        for column, args in steps.items():
+            # Deduplicated uploads share their derived files, only the first copy pays for them
+            if not os.path.exists(targets[column]):
+                self._encode(video_path, args, targets[column])
+
+        return {column: os.path.basename(path) for column, path in targets.items() if os.path.exists(path)}
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,41 @@
+import mysql.connector
+from dotenv import load_dotenv
+import os
+
+load_dotenv()
+
+# Derived upload files written by the background media stage (see media.py)
+MEDIA_COLUMNS = ['transcoded_path', 'thumbnail_path', 'preview_path']
+
+def migrate_media():
+    try:
+        conn = mysql.connector.connect(
+            host=os.getenv('DB_HOST', 'localhost'),
+            user=os.getenv('DB_USER', 'fitvisor_user'),
+            password=os.getenv('DB_PASSWORD'),
+            database=os.getenv('DB_NAME', 'fitvisor_db')
+        )
+        cursor = conn.cursor()
+        
+        for column in MEDIA_COLUMNS:
+            # Check if column exists
+            cursor.execute(f"SHOW COLUMNS FROM exercise_sessions LIKE '{column}'")
+            result = cursor.fetchone()
+            
+            if not result:
+                print(f"Adding {column} column...")
+                cursor.execute(f"ALTER TABLE exercise_sessions ADD COLUMN {column} VARCHAR(255) DEFAULT NULL")
+                conn.commit()
+                print(f"Migration successful: {column} column added.")
+            else:
+                print(f"Column {column} already exists.")
+
+    except mysql.connector.Error as err:
+        print(f"Error: {err}")
+    finally:
+        if 'conn' in locals() and conn.is_connected():
+            cursor.close()
+            conn.close()
+
+if __name__ == "__main__":
+    migrate_media()
@@ -0,0 +1,59 @@
+import mysql.connector
+from dotenv import load_dotenv
+import os
+
+load_dotenv()
+
+# Columns the retention engine needs (see retention.py)
+RETENTION_COLUMNS = {
+    'video_size': "BIGINT DEFAULT NULL",
+    'last_viewed_at': "TIMESTAMP NULL DEFAULT NULL",
+    'video_archived': "BOOLEAN NOT NULL DEFAULT FALSE",
+    'archived_at': "TIMESTAMP NULL DEFAULT NULL"
+}
+UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uploads')
+
+def migrate_retention():
+    try:
+        conn = mysql.connector.connect(
+            host=os.getenv('DB_HOST', 'localhost'),
+            user=os.getenv('DB_USER', 'fitvisor_user'),
+            password=os.getenv('DB_PASSWORD'),
+            database=os.getenv('DB_NAME', 'fitvisor_db')
+        )
+        cursor = conn.cursor()
+        
+        for column, definition in RETENTION_COLUMNS.items():
+            # Check if column exists
+            cursor.execute(f"SHOW COLUMNS FROM exercise_sessions LIKE '{column}'")
+            result = cursor.fetchone()
+            
+            if not result:
+                print(f"Adding {column} column...")
+                cursor.execute(f"ALTER TABLE exercise_sessions ADD COLUMN {column} {definition}")
+                conn.commit()
+                print(f"Migration successful: {column} column added.")
+            else:
+                print(f"Column {column} already exists.")
+
+        # Backfill sizes so existing uploads count towards quotas
+        cursor.execute("SELECT DISTINCT video_path FROM exercise_sessions WHERE video_path IS NOT NULL AND video_size IS NULL")
+        backfilled = 0
+        for (video_path,) in cursor.fetchall():
+            file_path = os.path.join(UPLOAD_FOLDER, video_path)
+            if os.path.exists(file_path):
+                cursor.execute("UPDATE exercise_sessions SET video_size = %s WHERE video_path = %s",
+                               (os.path.getsize(file_path), video_path))
+                backfilled += 1
+        conn.commit()
+        print(f"Backfilled video_size for {backfilled} uploads.")
+
+    except mysql.connector.Error as err:
+        print(f"Error: {err}")
+    finally:
+        if 'conn' in locals() and conn.is_connected():
+            cursor.close()
+            conn.close()
+
+if __name__ == "__main__":
+    migrate_retention()
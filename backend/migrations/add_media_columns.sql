@@ -0,0 +1,7 @@
+USE fitvisor_db;
+
+-- Files derived from each upload by the background media stage (see media.py)
+ALTER TABLE exercise_sessions
+    ADD COLUMN transcoded_path VARCHAR(255) DEFAULT NULL,
+    ADD COLUMN thumbnail_path VARCHAR(255) DEFAULT NULL,
+    ADD COLUMN preview_path VARCHAR(255) DEFAULT NULL;
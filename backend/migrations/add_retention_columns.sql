@@ -0,0 +1,9 @@
+USE fitvisor_db;
+
+-- Retention engine (see retention.py): stored size, last view, and archive state
+-- for sessions whose video was evicted
+ALTER TABLE exercise_sessions
+    ADD COLUMN video_size BIGINT DEFAULT NULL,
+    ADD COLUMN last_viewed_at TIMESTAMP NULL DEFAULT NULL,
+    ADD COLUMN video_archived BOOLEAN NOT NULL DEFAULT FALSE,
+    ADD COLUMN archived_at TIMESTAMP NULL DEFAULT NULL;
@@ -0,0 +1,5 @@
+USE fitvisor_db;
+
+-- Uploads are content-addressed and shared between sessions (see storage.py);
+-- deleting a session counts the remaining references by video_path
+CREATE INDEX idx_exercise_sessions_video_path ON exercise_sessions (video_path);
@@ -0,0 +1,48 @@
+class RunningReport:
+    """Constant-memory statistics behind a session report.
+
+    Form scores are kept as a running count/sum instead of a per-frame list,
+    mistakes as per-label frame counters, and each rep's average form score is
+    folded in when the rep completes. Memory and report cost do not grow with
+    session length (only rep_scores grows, one entry per rep).
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.total_frames = 0
+        self.scored_frames = 0
+        self.good_frames = 0
+        self.score_sum = 0.0
+        self.mistake_counts = {} # Mistake label -> frames it was detected in
+        self.rep_scores = []
+
+        # Current (unfinished) rep
+        self._rep_sum = 0.0
+        self._rep_count = 0
+
+    def add_frame(self):
+        self.total_frames += 1
+
+    def add_form_score(self, score, mistakes=()):
+        self.scored_frames += 1
+        self.score_sum += score
+        if score >= 1.0:
+            self.good_frames += 1
+        for mistake in mistakes:
+            self.mistake_counts[mistake] = self.mistake_counts.get(mistake, 0) + 1
+        self._rep_sum += score
+        self._rep_count += 1
+
+    def end_rep(self):
+        """Close the current rep; reps with no scored frames are recorded as perfect"""
+        rep_score = self._rep_sum / self._rep_count if self._rep_count else 1.0
+        self.rep_scores.append(rep_score)
+        self._rep_sum = 0.0
+        self._rep_count = 0
+
+    def mean_score(self):
+        if not self.scored_frames:
+            return None
+        return self.score_sum / self.scored_frames
@@ -0,0 +1,216 @@
+import os
+import time
+from datetime import datetime, timedelta
+from media import derived_paths
+
+MB = 1024 * 1024
+
+def _quota(value):
+    return int(float(value) * MB) if value else None
+
+class RetentionPolicy:
+    """Chooses which stored videos to evict, without touching anything.
+
+    Works per stored file (several sessions can share one, see storage.py):
+      1. files nobody has viewed or uploaded for RETENTION_MAX_AGE_DAYS
+      2. per user, least recently viewed first until the user is under RETENTION_USER_QUOTA_MB
+      3. globally, least recently viewed first until under RETENTION_GLOBAL_QUOTA_MB
+    A file's last activity is its latest view, or its upload time if never viewed.
+    At most `batch` files are returned per pass so eviction runs incrementally.
+    """
+
+    def __init__(self, global_quota=None, user_quota=None, max_age_days=None, batch=None):
+        self.global_quota = _quota(global_quota or os.getenv('RETENTION_GLOBAL_QUOTA_MB'))
+        self.user_quota = _quota(user_quota or os.getenv('RETENTION_USER_QUOTA_MB'))
+        max_age_days = max_age_days or os.getenv('RETENTION_MAX_AGE_DAYS')
+        self.max_age = timedelta(days=float(max_age_days)) if max_age_days else None
+        self.batch = int(batch or os.getenv('RETENTION_BATCH', 50))
+
+    @staticmethod
+    def group_files(rows):
+        """Fold session rows into one entry per stored file"""
+        files = {}
+        for row in rows:
+            entry = files.setdefault(row['video_path'], {
+                "videoPath": row['video_path'],
+                "size": row['video_size'] or 0,
+                "users": set(),
+                "sessions": [],
+                "lastActivity": None
+            })
+            entry['users'].add(row['user_id'])
+            entry['sessions'].append(row['id'])
+            activity = row['last_viewed_at'] or row['created_at']
+            if entry['lastActivity'] is None or activity > entry['lastActivity']:
+                entry['lastActivity'] = activity
+        return list(files.values())
+
+    def plan(self, rows, now=None):
+        """Eviction candidates for the live (not archived) session rows, each tagged with a reason"""
+        now = now or datetime.now()
+        files = sorted(self.group_files(rows), key=lambda entry: entry['lastActivity'])
+        evicted = {}
+
+        def evict(entry, reason):
+            if entry['videoPath'] not in evicted:
+                evicted[entry['videoPath']] = dict(entry, users=sorted(entry['users']), reason=reason)
+
+        if self.max_age is not None:
+            for entry in files:
+                if now - entry['lastActivity'] > self.max_age:
+                    evict(entry, 'age')
+
+        if self.user_quota is not None:
+            usage = {}
+            for entry in files:
+                if entry['videoPath'] not in evicted:
+                    for user_id in entry['users']:
+                        usage[user_id] = usage.get(user_id, 0) + entry['size']
+            for entry in files:
+                if entry['videoPath'] in evicted:
+                    continue
+                over = [user_id for user_id in entry['users'] if usage[user_id] > self.user_quota]
+                if over:
+                    evict(entry, 'user_quota')
+                    for user_id in entry['users']:
+                        usage[user_id] -= entry['size']
+
+        if self.global_quota is not None:
+            total = sum(entry['size'] for entry in files if entry['videoPath'] not in evicted)
+            for entry in files:
+                if total <= self.global_quota:
+                    break
+                if entry['videoPath'] not in evicted:
+                    evict(entry, 'global_quota')
+                    total -= entry['size']
+
+        ordered = sorted(evicted.values(), key=lambda entry: entry['lastActivity'])
+        return ordered[:self.batch]
+
+class RetentionEngine:
+    """Applies RetentionPolicy to uploads: archives sessions and frees their video files.
+
+    Archived sessions keep their row, reps and accuracy, and the small derived
+    files worth keeping (poster thumbnail, landmark sidecar for rescoring);
+    the video itself, its rendition and its preview strip are deleted.
+    """
+
+    def __init__(self, get_connection, content_store, policy=None):
+        self.get_connection = get_connection
+        self.content_store = content_store
+        self.policy = policy or RetentionPolicy()
+
+    def enabled(self):
+        return any(limit is not None for limit in (self.policy.global_quota, self.policy.user_quota, self.policy.max_age))
+
+    def _live_rows(self, cursor):
+        cursor.execute("""
+            SELECT id, user_id, video_path, video_size, created_at, last_viewed_at
+            FROM exercise_sessions
+            WHERE video_path IS NOT NULL AND video_archived = FALSE
+        """)
+        return cursor.fetchall()
+
+    def run_once(self, dry_run=False):
+        """One eviction pass; returns a report of what was (or would be) evicted"""
+        conn = self.get_connection()
+        if not conn:
+            return None
+        cursor = conn.cursor(dictionary=True)
+        try:
+            rows = self._live_rows(cursor)
+            candidates = self.policy.plan(rows)
+            if not dry_run:
+                candidates = [entry for entry in candidates if self._evict(conn, cursor, entry)]
+            freed = sum(entry['size'] for entry in candidates)
+
+            stored = sum(entry['size'] for entry in self.policy.group_files(rows))
+            return {
+                "dryRun": dry_run,
+                "storedBytes": stored,
+                "freedBytes": freed,
+                "evicted": [
+                    {"videoPath": entry['videoPath'], "size": entry['size'], "reason": entry['reason'],
+                     "users": entry['users'], "sessions": entry['sessions'],
+                     "lastActivity": entry['lastActivity'].isoformat()}
+                    for entry in candidates
+                ]
+            }
+        finally:
+            cursor.close()
+            conn.close()
+
+    def _evict(self, conn, cursor, entry):
+        """Archive a planned file's sessions and delete it; False if it became live again.
+
+        Runs under the content store lock, like uploads and deletes, so no new
+        session can reference the file in between; a file uploaded again or
+        viewed since the plan was made is kept.
+        """
+        with self.content_store.lock():
+            cursor.execute("""
+                SELECT COUNT(*) AS newer FROM exercise_sessions
+                WHERE video_path = %s AND video_archived = FALSE
+                  AND COALESCE(last_viewed_at, created_at) > %s
+            """, (entry['videoPath'], entry['lastActivity']))
+            if cursor.fetchone()['newer']:
+                return False
+            cursor.execute("""
+                UPDATE exercise_sessions
+                SET video_archived = TRUE, archived_at = NOW(), transcoded_path = NULL, preview_path = NULL
+                WHERE video_path = %s
+            """, (entry['videoPath'],))
+            conn.commit()
+            self._delete_files(entry['videoPath'])
+        return True
+
+    def _delete_files(self, video_path):
+        path = self.content_store.path(video_path)
+        derived = derived_paths(path)
+        for stored in (path, derived['transcoded_path'], derived['preview_path']):
+            if os.path.exists(stored):
+                os.remove(stored)
+
+    def run_forever(self, sleep=time.sleep, interval=None):
+        """Evict a batch every RETENTION_INTERVAL seconds"""
+        interval = float(interval or os.getenv('RETENTION_INTERVAL', 3600))
+        while True:
+            sleep(interval)
+            try:
+                report = self.run_once()
+            except Exception as e:
+                print(f"❌ Retention pass failed: {e}")
+                continue
+            if report and report['evicted']:
+                print(f"Retention: archived {len(report['evicted'])} videos, freed {report['freedBytes'] / MB:.1f} MB")
+
+class ViewTracker:
+    """Throttles last_viewed_at writes: a video player issues many range requests
+    per view, so each file is touched at most once per RETENTION_VIEW_INTERVAL seconds.
+    """
+
+    def __init__(self, interval=None):
+        self.interval = float(interval or os.getenv('RETENTION_VIEW_INTERVAL', 600))
+        self._last_touch = {}
+
+    def should_touch(self, path, now=None):
+        now = now or time.monotonic()
+        last = self._last_touch.get(path)
+        if last is not None and now - last < self.interval:
+            return False
+        if len(self._last_touch) > 10000:
+            self._last_touch = {p: t for p, t in self._last_touch.items() if now - t < self.interval}
+        self._last_touch[path] = now
+        return True
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    from db import get_db_connection
+    from storage import ContentStore
+
+    parser = argparse.ArgumentParser(description="Run one retention pass over uploads/")
+    parser.add_argument('--dry-run', action='store_true', help="report what would be evicted without deleting")
+    args = parser.parse_args()
+    engine = RetentionEngine(get_db_connection, ContentStore('uploads'))
+    print(json.dumps(engine.run_once(dry_run=args.dry_run), indent=2))
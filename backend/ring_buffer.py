@@ -0,0 +1,43 @@
+import numpy as np
+
+class WindowBuffer:
+    """Fixed-size float32 sliding window over per-frame feature rows.
+
+    Rows are written in place into preallocated storage. Every row is stored
+    twice (at i and i + size), so the last `size` rows in oldest-to-newest order
+    are always one contiguous slice and window() can hand the model a
+    (1, size, width) view without copying or allocating per frame.
+    """
+
+    def __init__(self, size, width, dtype=np.float32):
+        self.size = size
+        self.width = width
+        self._data = np.zeros((2 * size, width), dtype=dtype)
+        self._pos = 0 # Next slot to write, also the oldest row once full
+        self._count = 0
+        # Precomputed (1, size, width) views, one per possible start slot
+        self._views = [self._data[i:i + size][np.newaxis] for i in range(size)]
+
+    def append(self, row):
+        self._data[self._pos] = row
+        self._data[self._pos + self.size] = row
+        self._pos = (self._pos + 1) % self.size
+        if self._count < self.size:
+            self._count += 1
+
+    def clear(self):
+        self._pos = 0
+        self._count = 0
+
+    def is_full(self):
+        return self._count == self.size
+
+    def window(self):
+        """Contiguous (1, size, width) view of the window, oldest frame first.
+
+        The view is only valid until the next append(); copy it if it has to outlive that.
+        """
+        return self._views[self._pos]
+
+    def __len__(self):
+        return self._count
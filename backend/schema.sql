@@ -29,6 +29,14 @@ CREATE TABLE IF NOT EXISTS exercise_sessions (
     exercise_type VARCHAR(50) NOT NULL,
     reps INT NOT NULL,
     video_path VARCHAR(255),
+    video_size BIGINT DEFAULT NULL,
+    last_viewed_at TIMESTAMP NULL DEFAULT NULL,
+    video_archived BOOLEAN NOT NULL DEFAULT FALSE,
+    archived_at TIMESTAMP NULL DEFAULT NULL,
+    transcoded_path VARCHAR(255) DEFAULT NULL,
+    thumbnail_path VARCHAR(255) DEFAULT NULL,
+    preview_path VARCHAR(255) DEFAULT NULL,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_exercise_sessions_video_path (video_path),
     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
 );
@@ -0,0 +1,100 @@
+import os
+import threading
+from exercise_detector import ExerciseDetector
+from fusion_model import get_shared_model
+from frame_rate import FrameRatePolicy, REFERENCE_FPS
+
+# Fields whose change triggers a stats_update; report rides along when completed flips
+TRACKED_FIELDS = ('reps', 'feedback', 'stage', 'isActive', 'completed', 'gestureProgress')
+
+class StatsTracker:
+    """Remembers what one client was last sent so stats_update only carries changes.
+
+    Every keyframe_interval frames (and on request) the full stats dict is sent
+    with keyframe=True so the client can resync.
+    """
+
+    def __init__(self, keyframe_interval=None):
+        self.keyframe_interval = int(keyframe_interval or os.getenv('STATS_KEYFRAME_INTERVAL', 90))
+        self.last_sent = None
+        self.frames_since_keyframe = 0
+
+    def diff(self, stats, keyframe=False):
+        """Return the payload to emit for these stats, or None if nothing changed"""
+        self.frames_since_keyframe += 1
+        if keyframe or self.last_sent is None or self.frames_since_keyframe >= self.keyframe_interval:
+            self.last_sent = {field: stats[field] for field in TRACKED_FIELDS}
+            self.frames_since_keyframe = 0
+            return dict(stats, keyframe=True)
+
+        changed = {field: stats[field] for field in TRACKED_FIELDS if stats[field] != self.last_sent[field]}
+        if not changed:
+            return None
+
+        self.last_sent.update(changed)
+        if 'completed' in changed:
+            changed['report'] = stats['report']
+        return changed
+
+class SessionRegistry:
+    """Keeps one ExerciseDetector per Socket.IO connection, keyed by sid.
+
+    Detectors only hold per-user state (counter, stage, buffers, report stats);
+    the Keras model is loaded once and shared between all of them. Pass
+    model_loader=None to run rep counting without form inference.
+    """
+
+    def __init__(self, model_loader=get_shared_model, inference_engine=None, on_result=None, hop=None):
+        self.model_loader = model_loader
+        self.hop = hop # Shared AdaptiveHop, so every session backs off together under load
+        self.frame_rate = FrameRatePolicy(hop)
+        # Shared BatchInferenceEngine; on_result(sid, stats) is called when a batch returns
+        self.inference_engine = inference_engine
+        self.on_result = on_result
+        self._sessions = {}
+        self._trackers = {}
+        self._lock = threading.Lock()
+
+    def get(self, sid):
+        """Return the detector for this sid, creating it on first use"""
+        with self._lock:
+            detector = self._sessions.get(sid)
+            if detector is None:
+                detector = ExerciseDetector(model_loader=self.model_loader)
+                detector.inference_engine = self.inference_engine
+                detector.hop = self.hop
+                if self.on_result:
+                    detector.on_result = lambda stats: self.on_result(sid, stats)
+                self._sessions[sid] = detector
+                self._trackers[sid] = StatsTracker()
+            return detector
+
+    def stats_delta(self, sid, stats, keyframe=False):
+        """Changed-fields payload for this sid's next stats_update, or None to skip the emit"""
+        with self._lock:
+            tracker = self._trackers.get(sid)
+        if tracker is None:
+            return None # Session already gone
+        return tracker.diff(stats, keyframe)
+
+    def negotiate_rate(self, sid):
+        """New landmark send rate for this sid, or None if the client already has it"""
+        detector = self.get(sid)
+        fps = self.frame_rate.target(detector.current_exercise, detector.is_active, len(self))
+        if fps == detector.client_fps:
+            return None
+        detector.client_fps = fps
+        detector.frame_weight = max(1.0, REFERENCE_FPS / fps)
+        return fps
+
+    def remove(self, sid):
+        with self._lock:
+            detector = self._sessions.pop(sid, None)
+            self._trackers.pop(sid, None)
+        if detector is not None and self.inference_engine is not None:
+            self.inference_engine.discard(detector)
+        return detector
+
+    def __len__(self):
+        with self._lock:
+            return len(self._sessions)
@@ -0,0 +1,124 @@
+import os
+import fcntl
+import hashlib
+import time
+import uuid
+from contextlib import contextmanager
+
+COPY_BLOCK = 64 * 1024
+
+class ContentStore:
+    """Content-addressed upload storage under <root>/cas/ab/cd/<sha256><ext>.
+
+    Files are hashed while they are written and named by their digest, so the
+    same recording uploaded twice is stored once; the second ingest just drops
+    its temp file. Two levels of 256 shards keep every directory small even
+    with millions of uploads. Stored files never change, so the relative path
+    is a stable identity for caching. Rows in exercise_sessions reference a
+    file through video_path, and a file is only deleted once no row does
+    (see app.delete_exercise).
+
+    Placing a file and inserting the row that references it must not
+    interleave with counting references and deleting: a duplicate upload
+    would otherwise be pointed at a file that is removed a moment later. Both
+    sides run under lock(), a flock on <root>/.lock shared by every process.
+    """
+
+    LOCK_TIMEOUT = 30
+
+    def __init__(self, root, sleep=time.sleep):
+        self.root = root
+        self.tmp_dir = os.path.join(root, '.tmp')
+        self.lock_path = os.path.join(root, '.lock')
+        # Waits for the lock by polling, so under eventlet (pass socketio.sleep) it never blocks the hub
+        self.sleep = sleep
+        os.makedirs(self.tmp_dir, exist_ok=True)
+
+    @contextmanager
+    def lock(self):
+        """Exclusive across processes and green threads, for adding a first or removing a last reference"""
+        with open(self.lock_path, 'a') as f:
+            deadline = time.monotonic() + self.LOCK_TIMEOUT
+            while True:
+                try:
+                    fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    if time.monotonic() > deadline:
+                        raise TimeoutError(f"Upload store lock busy for {self.LOCK_TIMEOUT}s")
+                    self.sleep(0.01)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    @staticmethod
+    def relative_path(digest, ext):
+        return os.path.join('cas', digest[:2], digest[2:4], digest + ext)
+
+    def path(self, relative_path):
+        """Absolute path of a stored file (also works for legacy flat upload names)"""
+        return os.path.join(self.root, relative_path)
+
+    def place(self, staged, ext):
+        """Move a staged (tmp_path, digest) file into the store; returns (relative_path, created).
+
+        Call under lock() together with the INSERT that references the result.
+        If that INSERT fails, unplace() a file this call created before releasing
+        the lock: nothing else can reference it yet, and an unreferenced file
+        would never be found by deletes or retention.
+        """
+        tmp_path, digest = staged
+        relative_path = self.relative_path(digest, ext)
+        target = self.path(relative_path)
+        if os.path.exists(target):
+            os.remove(tmp_path) # Duplicate content, keep the stored copy
+            return relative_path, False
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.replace(tmp_path, target)
+        return relative_path, True
+
+    def unplace(self, relative_path):
+        """Remove a file place() just created, under the same lock()"""
+        path = self.path(relative_path)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def stage_stream(self, stream):
+        """Write a file-like object to a temp file, hashing as it streams; returns (tmp_path, digest)"""
+        tmp_path = os.path.join(self.tmp_dir, uuid.uuid4().hex)
+        digest = hashlib.sha256()
+        try:
+            with open(tmp_path, 'wb') as f:
+                while True:
+                    block = stream.read(COPY_BLOCK)
+                    if not block:
+                        break
+                    digest.update(block)
+                    f.write(block)
+        except Exception:
+            os.remove(tmp_path)
+            raise
+        return tmp_path, digest.hexdigest()
+
+    def stage_file(self, file_path, keep=False):
+        """Hash a file already on disk (same filesystem) for place(); returns (staged_path, digest).
+
+        place() moves the file into the store; with keep=True a hard link is
+        staged instead, so the original survives until the caller removes it.
+        """
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(COPY_BLOCK), b''):
+                digest.update(block)
+        if keep:
+            staged_path = os.path.join(self.tmp_dir, uuid.uuid4().hex)
+            os.link(file_path, staged_path)
+            file_path = staged_path
+        return file_path, digest.hexdigest()
+
+    @staticmethod
+    def discard(staged):
+        """Drop a staged file that will not be placed"""
+        if os.path.exists(staged[0]):
+            os.remove(staged[0])
@@ -0,0 +1,173 @@
+import os
+import json
+import time
+import uuid
+import threading
+
+COPY_BLOCK = 64 * 1024
+
+class UploadError(Exception):
+    """Rejected upload operation; status is the HTTP code to answer with"""
+
+    def __init__(self, message, status=400, offset=None):
+        super().__init__(message)
+        self.status = status
+        self.offset = offset
+
+class ChunkedUploadStore:
+    """Resumable uploads written straight to disk under <upload_dir>/.partial.
+
+    Each upload is a <id>.part data file plus a <id>.json metadata file, so an
+    interrupted upload survives a server restart. The acknowledged offset is
+    simply the size of the .part file: a chunk is accepted only at that offset,
+    streamed to disk in COPY_BLOCK pieces, and a client that lost its connection
+    asks for the offset and resends from there.
+    """
+
+    def __init__(self, upload_dir, max_bytes=None, ttl=None):
+        self.upload_dir = upload_dir
+        self.partial_dir = os.path.join(upload_dir, '.partial')
+        self.max_bytes = int(max_bytes or os.getenv('UPLOAD_MAX_BYTES', 512 * 1024 * 1024))
+        self.ttl = float(ttl or os.getenv('UPLOAD_PARTIAL_TTL', 24 * 3600))
+        os.makedirs(self.partial_dir, exist_ok=True)
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+        self._writing = {} # upload id -> offset the chunk being written started at
+
+    def _paths(self, upload_id):
+        if not upload_id.isalnum():
+            raise UploadError("Invalid upload id", 404)
+        base = os.path.join(self.partial_dir, upload_id)
+        return base + '.part', base + '.json'
+
+    def _acquire(self, upload_id):
+        """Take the upload's lock without waiting (see append), or raise 409 while it is busy"""
+        with self._locks_guard:
+            lock = self._locks.setdefault(upload_id, threading.Lock())
+        if not lock.acquire(blocking=False):
+            offset = self._writing.get(upload_id)
+            raise UploadError("Another request for this upload is in progress", 409,
+                              offset=self.offset(upload_id) if offset is None else offset)
+        return lock
+
+    @staticmethod
+    def _parse_size(value):
+        if value is None:
+            return None
+        if isinstance(value, bool) or isinstance(value, float) and not value.is_integer():
+            raise UploadError("totalSize must be a non-negative integer", 400)
+        try:
+            size = int(value)
+        except (TypeError, ValueError):
+            raise UploadError("totalSize must be a non-negative integer", 400)
+        if size < 0:
+            raise UploadError("totalSize must be a non-negative integer", 400)
+        return size
+
+    def create(self, metadata, total_size=None):
+        """Start an upload; metadata is handed back by finalize()"""
+        total_size = self._parse_size(total_size)
+        if total_size is not None and total_size > self.max_bytes:
+            raise UploadError(f"Upload exceeds {self.max_bytes} bytes", 413)
+        self.expire()
+        upload_id = uuid.uuid4().hex
+        data_path, meta_path = self._paths(upload_id)
+        open(data_path, 'wb').close()
+        with open(meta_path, 'w') as f:
+            json.dump({"metadata": metadata, "totalSize": total_size, "createdAt": time.time()}, f)
+        return upload_id
+
+    def metadata(self, upload_id):
+        _, meta_path = self._paths(upload_id)
+        try:
+            with open(meta_path) as f:
+                return json.load(f)['metadata']
+        except (OSError, ValueError):
+            raise UploadError("Upload not found", 404)
+
+    def offset(self, upload_id):
+        data_path, meta_path = self._paths(upload_id)
+        if not os.path.exists(meta_path):
+            raise UploadError("Upload not found", 404)
+        return os.path.getsize(data_path)
+
+    def append(self, upload_id, offset, stream):
+        """Stream one chunk from a file-like object; returns the new offset.
+
+        Reading the request stream yields to the eventlet hub while the lock is
+        held, and the lock is a real OS lock (threading is not monkey-patched),
+        so a second writer must never block on it: it gets a 409 with the
+        offset the chunk in flight started at and retries once that PUT is done.
+        """
+        data_path, _ = self._paths(upload_id)
+        lock = self._acquire(upload_id)
+        try:
+            current = self.offset(upload_id)
+            self._writing[upload_id] = current
+            if offset != current:
+                raise UploadError(f"Expected offset {current}", 409, offset=current)
+            with open(data_path, 'ab') as f:
+                while True:
+                    block = stream.read(COPY_BLOCK)
+                    if not block:
+                        break
+                    if f.tell() + len(block) > self.max_bytes:
+                        f.truncate(current) # Drop the partial chunk, the client may retry
+                        raise UploadError(f"Upload exceeds {self.max_bytes} bytes", 413, offset=current)
+                    f.write(block)
+                f.flush()
+                os.fsync(f.fileno())
+                return f.tell()
+        finally:
+            self._writing.pop(upload_id, None)
+            lock.release()
+
+    def finalize(self, upload_id):
+        """Check that an upload is complete and return (data_path, metadata).
+
+        The upload stays locked (further chunks and finalizes get 409) and on
+        disk until finish() is called: with success=True once the caller has
+        stored it, otherwise it is left as it was, so /complete can be retried.
+        """
+        data_path, meta_path = self._paths(upload_id)
+        lock = self._acquire(upload_id)
+        try:
+            if not os.path.exists(meta_path):
+                raise UploadError("Upload not found", 404)
+            with open(meta_path) as f:
+                info = json.load(f)
+            size = os.path.getsize(data_path)
+            if info['totalSize'] is not None and size != info['totalSize']:
+                raise UploadError(f"Upload incomplete ({size} of {info['totalSize']} bytes)", 409, offset=size)
+            if size == 0:
+                raise UploadError("Upload is empty", 400)
+        except BaseException:
+            lock.release()
+            raise
+        return data_path, info['metadata']
+
+    def finish(self, upload_id, success):
+        """End a finalize(); a successful one removes the upload's files"""
+        data_path, meta_path = self._paths(upload_id)
+        with self._locks_guard:
+            lock = self._locks.pop(upload_id) if success else self._locks[upload_id]
+        if success:
+            for path in (data_path, meta_path):
+                if os.path.exists(path):
+                    os.remove(path)
+        lock.release()
+
+    def expire(self, now=None):
+        """Delete partial uploads nobody has touched for UPLOAD_PARTIAL_TTL seconds"""
+        now = now or time.time()
+        for name in os.listdir(self.partial_dir):
+            if not name.endswith('.part'):
+                continue
+            data_path = os.path.join(self.partial_dir, name)
+            meta_path = data_path[:-len('.part')] + '.json'
+            try:
+                if now - os.path.getmtime(data_path) > self.ttl:
+                    os.remove(data_path)
+                    os.remove(meta_path)
+            except OSError:
+                pass
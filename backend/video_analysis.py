@@ -0,0 +1,287 @@
+import os
+import sys
+import shutil
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
+from features import NUM_LANDMARKS
+from frame_rate import EXERCISE_RATES, IDLE_RATE, REFERENCE_FPS
+
+# Hip landmarks, the origin the live client normalizes against
+LEFT_HIP, RIGHT_HIP = 23, 24
+
+# Landmark sidecar: <video>.pose-v2.npy next to the upload, one record per frame
+# sampled at SIDECAR_FPS; frames where nobody was detected are stored as NaN so
+# timing survives. Bump the version when PoseEstimator output changes.
+SIDECAR_SUFFIX = '.pose-v2.npy' # v2: Tasks PoseLandmarker (v1 was the legacy solutions API)
+SIDECAR_FPS = max(REFERENCE_FPS, max(rate[0] for rate in EXERCISE_RATES.values()))
+SIDECAR_DTYPE = np.dtype([('t', '<f4'), ('points', '<f4', (NUM_LANDMARKS, 4))])
+
+def analysis_fps(exercise_type):
+    """Frames per second of video worth running pose estimation on (VIDEO_ANALYSIS_FPS overrides)"""
+    override = os.getenv('VIDEO_ANALYSIS_FPS')
+    if override:
+        return float(override)
+    return EXERCISE_RATES.get(exercise_type, IDLE_RATE)[0]
+
+# MediaPipe Tasks pose model; downloaded next to this file on first use unless
+# POSE_MODEL_PATH points at a copy (offline installs).
+POSE_MODEL_URL = ('https://storage.googleapis.com/mediapipe-models/pose_landmarker/'
+                  'pose_landmarker_full/float16/latest/pose_landmarker_full.task')
+POSE_MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pose_landmarker_full.task')
+
+def _pose_model_path():
+    path = os.getenv('POSE_MODEL_PATH', POSE_MODEL_PATH)
+    if os.path.exists(path):
+        return path
+    import urllib.request
+    print(f"Downloading pose model to {path}")
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f, urllib.request.urlopen(POSE_MODEL_URL, timeout=60) as response:
+                shutil.copyfileobj(response, f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+    except OSError as e:
+        raise RuntimeError(f"Pose model missing at {path} and download failed ({e}); fetch {POSE_MODEL_URL} or set POSE_MODEL_PATH")
+    return path
+
+def _import_mediapipe():
+    """mediapipe, without the TensorFlow import its Tasks package does for a docs decorator.
+
+    mediapipe.tasks imports tensorflow.tools.docs whenever TensorFlow is installed
+    and falls back to a no-op without it; on a numpy-backend worker that import
+    alone is ~600 MB. TensorFlow is hidden only while mediapipe loads, and only
+    if nothing in this process has imported it yet.
+    """
+    if 'tensorflow' in sys.modules:
+        import mediapipe
+        return mediapipe
+    sys.modules['tensorflow'] = None
+    try:
+        import mediapipe
+    finally:
+        if sys.modules.get('tensorflow', 0) is None:
+            del sys.modules['tensorflow']
+    return mediapipe
+
+class PoseEstimator:
+    """MediaPipe Tasks PoseLandmarker in VIDEO mode, returning frames in the live wire layout.
+
+    mediapipe is imported on first use so API processes never pay for it. VIDEO
+    mode tracks across frames and needs strictly increasing timestamps, so each
+    new video continues the estimator's clock instead of restarting at zero.
+    """
+
+    def __init__(self, model_path=None):
+        mp = _import_mediapipe()
+        from mediapipe.tasks.python import BaseOptions
+        from mediapipe.tasks.python import vision
+        self._mp = mp
+        options = vision.PoseLandmarkerOptions(
+            base_options=BaseOptions(model_asset_path=model_path or _pose_model_path()),
+            running_mode=vision.RunningMode.VIDEO,
+            num_poses=1,
+            min_pose_detection_confidence=0.3,
+            min_pose_presence_confidence=0.3,
+            min_tracking_confidence=0.3
+        )
+        self._landmarker = vision.PoseLandmarker.create_from_options(options)
+        self._offset_ms = 0
+        self._last_ms = -1
+
+    def __call__(self, rgb_frame, timestamp_ms):
+        """(33, 4) hip-centred x/y/z/visibility float32 array, or None when nobody is in frame"""
+        clock_ms = int(timestamp_ms) + self._offset_ms
+        if clock_ms <= self._last_ms:
+            self._offset_ms += self._last_ms + 1 - clock_ms
+            clock_ms = self._last_ms + 1
+        self._last_ms = clock_ms
+
+        image = self._mp.Image(image_format=self._mp.ImageFormat.SRGB, data=np.ascontiguousarray(rgb_frame))
+        results = self._landmarker.detect_for_video(image, clock_ms)
+        if not results.pose_landmarks:
+            return None
+        points = np.array([(lm.x, lm.y, lm.z, lm.visibility) for lm in results.pose_landmarks[0]],
+                          dtype=np.float32)
+        hip_center = (points[LEFT_HIP, :3] + points[RIGHT_HIP, :3]) / 2
+        points[:, :3] -= hip_center
+        return points
+
+    def close(self):
+        self._landmarker.close()
+
+def sidecar_path(video_path):
+    return video_path + SIDECAR_SUFFIX
+
+def load_sidecar(video_path):
+    """Memory-mapped landmark records for a video, or None if missing or older than the video"""
+    path = sidecar_path(video_path)
+    try:
+        # An archived session keeps its sidecar after the video is evicted (see retention.py)
+        if os.path.exists(video_path) and os.path.getmtime(path) < os.path.getmtime(video_path):
+            return None
+        records = np.load(path, mmap_mode='r')
+    except (OSError, ValueError):
+        return None
+    return records if records.dtype == SIDECAR_DTYPE else None
+
+def _write_sidecar(video_path, timestamps, frames):
+    records = np.empty(len(frames), dtype=SIDECAR_DTYPE)
+    records['t'] = timestamps
+    if frames:
+        records['points'] = np.stack(frames)
+    # Written to a unique temp file and renamed, so a reader never maps a half-written
+    # file and parallel analyses of one deduplicated upload cannot clobber each other.
+    # Dot-prefixed so /uploads never serves it (see delivery.py).
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(video_path)),
+                                    prefix='.' + os.path.basename(video_path) + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            np.save(f, records)
+        os.replace(tmp_path, sidecar_path(video_path))
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+def _decode_pose_frames(video_path, fps, estimator):
+    """Stream (timestamp_ms, points or None) for every 1/fps seconds of a saved recording.
+
+    Frames are decoded one at a time; skipped frames are only grab()bed (demuxed,
+    never converted), so subsampling also saves the colour conversion. Timing
+    comes from frame timestamps because MediaRecorder .webm files often carry
+    no usable frame rate in their header.
+    """
+    import cv2
+    capture = cv2.VideoCapture(video_path)
+    if not capture.isOpened():
+        raise IOError(f"Cannot open video {video_path}")
+
+    interval_ms = 1000.0 / fps
+    next_ms = 0.0
+    try:
+        while capture.grab():
+            timestamp_ms = capture.get(cv2.CAP_PROP_POS_MSEC)
+            if timestamp_ms + 1e-3 < next_ms:
+                continue
+            next_ms = max(next_ms + interval_ms, timestamp_ms)
+            ok, frame = capture.retrieve()
+            if not ok:
+                break
+            yield timestamp_ms, estimator(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB), timestamp_ms)
+    finally:
+        capture.release()
+
+def iter_video_landmarks(video_path, fps, estimator=None, use_sidecar=True):
+    """Stream (points, present) for every 1/fps seconds of a saved recording.
+
+    The first pass decodes the video at SIDECAR_FPS, runs pose estimation and
+    saves the landmarks as a sidecar; later passes (another exercise type, a new
+    model) read the memory-mapped sidecar and never touch the video. A
+    PoseEstimator is only created when the video has to be decoded.
+    """
+    present = np.ones(NUM_LANDMARKS, dtype=bool)
+    interval_ms = 1000.0 / fps
+    next_ms = 0.0
+
+    records = load_sidecar(video_path) if use_sidecar else None
+    if records is not None:
+        for timestamp_ms, points in zip(records['t'], records['points']):
+            if timestamp_ms + 1e-3 < next_ms:
+                continue
+            next_ms = max(next_ms + interval_ms, timestamp_ms)
+            if not np.isnan(points[0, 0]):
+                yield points, present
+        return
+
+    own_estimator = estimator is None
+    if own_estimator:
+        estimator = PoseEstimator()
+    missing = np.full((NUM_LANDMARKS, 4), np.nan, dtype=np.float32)
+    timestamps, frames = [], []
+    try:
+        for timestamp_ms, points in _decode_pose_frames(video_path, max(fps, SIDECAR_FPS) if use_sidecar else fps, estimator):
+            if use_sidecar:
+                timestamps.append(timestamp_ms)
+                frames.append(missing if points is None else points)
+            if timestamp_ms + 1e-3 < next_ms:
+                continue
+            next_ms = max(next_ms + interval_ms, timestamp_ms)
+            if points is not None:
+                yield points, present
+    finally:
+        if own_estimator:
+            estimator.close()
+
+    if use_sidecar:
+        try:
+            _write_sidecar(video_path, timestamps, frames)
+        except OSError as e:
+            print(f"❌ Could not save landmark sidecar for {video_path}: {e}")
+
+# --- Process pool ---
+# Each worker loads its own pose estimator and fusion model once, in the initializer.
+_worker_model = None
+_worker_estimator = None
+
+def _init_worker(model_backend):
+    global _worker_model
+    from fusion_model import load_fusion_model
+    _worker_model = load_fusion_model(model_backend) if model_backend else None
+
+def _analyze(video_path, exercise_type):
+    global _worker_estimator
+    from exercise_detector import ExerciseDetector
+    # Created on the first video that needs decoding, not in the initializer: a
+    # missing pose model then fails that job with a readable error instead of
+    # breaking the pool, and sidecar-only rescoring never loads it.
+    if _worker_estimator is None and load_sidecar(video_path) is None:
+        _worker_estimator = PoseEstimator()
+    detector = ExerciseDetector(model=_worker_model, model_loader=None)
+    return detector.process_video(video_path, exercise_type, estimator=_worker_estimator)
+
+class VideoAnalyzer:
+    """Analyzes uploaded recordings in a pool of worker processes.
+
+    Pose estimation is CPU bound and holds the GIL, so uploads run in separate
+    processes (VIDEO_WORKERS, default half the cores) and several can be analyzed
+    in parallel. Workers use VIDEO_MODEL_BACKEND (default 'numpy', no TensorFlow
+    import per worker) for push-up form inference.
+    """
+
+    def __init__(self, workers=None, model_backend=None):
+        self.workers = int(workers or os.getenv('VIDEO_WORKERS', max(1, (os.cpu_count() or 2) // 2)))
+        self.model_backend = model_backend or os.getenv('VIDEO_MODEL_BACKEND', 'numpy')
+        self._executor = None
+
+    def _pool(self):
+        if self._executor is None:
+            # spawn: forking a process that has eventlet or TensorFlow loaded is not safe
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+                initargs=(self.model_backend,)
+            )
+        return self._executor
+
+    def submit(self, video_path, exercise_type):
+        """Future resolving to the process_video result dict"""
+        video_path = os.path.abspath(video_path)
+        try:
+            return self._pool().submit(_analyze, video_path, exercise_type)
+        except BrokenProcessPool:
+            # A worker died (crash, OOM kill); start a fresh pool rather than failing every upload
+            print("❌ Video analysis pool broken, restarting it")
+            self._executor = None
+            return self._pool().submit(_analyze, video_path, exercise_type)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,53 @@
+import struct
+import numpy as np
+from features import NUM_LANDMARKS
+
+# Binary process_data frame, little-endian:
+#   u8  version
+#   u8  exercise id (EXERCISE_IDS)
+#   u16 reserved
+#   u32 frame sequence number
+#   f32 landmarks[33][4] (x, y, z, visibility), NaN row = landmark missing
+WIRE_VERSION = 1
+HEADER = struct.Struct('<BBHI')
+FRAME_BYTES = HEADER.size + NUM_LANDMARKS * 4 * 4
+
+EXERCISE_IDS = {
+    1: 'Push-ups',
+    2: 'Squats',
+    3: 'Jumping Jacks'
+}
+EXERCISE_CODES = {name: code for code, name in EXERCISE_IDS.items()}
+
+class WireFormatError(ValueError):
+    pass
+
+def decode_frame(payload):
+    """Decode a binary frame into (exercise_type, seq, points, present).
+
+    points is a read-only (33, 4) float32 view over the payload (copied only
+    when some landmarks are missing), present is a (33,) bool mask.
+    """
+    if len(payload) != FRAME_BYTES:
+        raise WireFormatError(f"Expected {FRAME_BYTES} bytes, got {len(payload)}")
+
+    version, exercise_id, _, seq = HEADER.unpack_from(payload)
+    if version != WIRE_VERSION:
+        raise WireFormatError(f"Unsupported frame version {version}")
+
+    exercise_type = EXERCISE_IDS.get(exercise_id)
+    if exercise_type is None:
+        raise WireFormatError(f"Unknown exercise id {exercise_id}")
+
+    points = np.frombuffer(payload, dtype='<f4', count=NUM_LANDMARKS * 4, offset=HEADER.size).reshape(NUM_LANDMARKS, 4)
+    present = ~np.isnan(points[:, 0])
+    if not present.all():
+        points = np.nan_to_num(points)
+    return exercise_type, seq, points, present
+
+def encode_frame(exercise_type, seq, points, present=None):
+    """Inverse of decode_frame (used by tools and benchmarks; the browser encodes its own frames)"""
+    body = np.asarray(points, dtype='<f4').copy()
+    if present is not None:
+        body[~np.asarray(present)] = np.nan
+    return HEADER.pack(WIRE_VERSION, EXERCISE_CODES[exercise_type], 0, seq) + body.tobytes()
@@ -296,12 +296,20 @@ export default function AdminUsers({ onBack }) {
                                                         <span className="bg-blue-100 text-[#3B82F6] px-3 py-1 rounded-full font-black text-sm">{ex.reps}</span>
                                                     </td>
                                                     <td className="px-6 py-4 whitespace-nowrap text-center">
-                                                        {ex.video_path ? (
+                                                        {ex.video_archived ? (
+                                                            // Video evicted by retention, the session and its stats remain
+                                                            <span className="text-xs text-slate-400">Archived</span>
+                                                        ) : ex.video_path ? (
                                                             <button
-                                                                onClick={() => setSelectedVideo(`http://localhost:8000/uploads/${ex.video_path}`)}
+                                                                // Compact rendition once the media stage has produced it, raw upload until then
+                                                                onClick={() => setSelectedVideo(`http://localhost:8000/uploads/${ex.transcoded_path || ex.video_path}`)}
                                                                 className="text-[#3B82F6] hover:text-[#2563EB] bg-blue-50 hover:bg-blue-100 px-3 py-1.5 rounded-lg text-xs font-bold flex items-center gap-2 mx-auto transition-colors"
                                                             >
-                                                                <FontAwesomeIcon icon={faPlay} />
+                                                                {ex.thumbnail_path ? (
+                                                                    <img src={`http://localhost:8000/uploads/${ex.thumbnail_path}`} alt="" loading="lazy" className="w-12 h-8 object-cover rounded" />
+                                                                ) : (
+                                                                    <FontAwesomeIcon icon={faPlay} />
+                                                                )}
                                                                 Watch
                                                             </button>
                                                         ) : (
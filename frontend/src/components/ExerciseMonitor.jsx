@@ -9,12 +9,49 @@ import { drawConnectors, drawLandmarks } from '@mediapipe/drawing_utils';
 import { POSE_CONNECTIONS } from '@mediapipe/pose';
 
 const SOCKET_URL = 'http://localhost:8000';
+const API_URL = 'http://localhost:8000';
+
+// Binary process_data frame (must match backend/wire_format.py):
+// u8 version, u8 exercise id, u16 reserved, u32 sequence, then 33 x (x, y, z, visibility) float32.
+// Exercises without an id fall back to the JSON payload.
+const WIRE_VERSION = 1;
+const FRAME_HEADER_BYTES = 8;
+const NUM_LANDMARKS = 33;
+const EXERCISE_IDS = { 'Push-ups': 1, 'Squats': 2, 'Jumping Jacks': 3 };
+
+const encodeFrame = (exerciseId, seq, landmarks, hipCenter) => {
+    const buffer = new ArrayBuffer(FRAME_HEADER_BYTES + NUM_LANDMARKS * 4 * 4);
+    const header = new DataView(buffer);
+    header.setUint8(0, WIRE_VERSION);
+    header.setUint8(1, exerciseId);
+    header.setUint16(2, 0, true);
+    header.setUint32(4, seq, true);
+
+    const body = new Float32Array(buffer, FRAME_HEADER_BYTES);
+    for (let i = 0; i < NUM_LANDMARKS; i++) {
+        const lm = landmarks[i];
+        const o = i * 4;
+        if (lm) {
+            body[o] = lm.x - hipCenter.x;
+            body[o + 1] = lm.y - hipCenter.y;
+            body[o + 2] = lm.z - hipCenter.z;
+            body[o + 3] = lm.visibility;
+        } else {
+            body.fill(NaN, o, o + 4); // Missing landmark
+        }
+    }
+    return buffer;
+};
 
 const ExerciseMonitor = ({ exerciseType, userId, onBack }) => {
     const videoRef = useRef(null);
     const overlayCanvasRef = useRef(null);
     const mediaRecorderRef = useRef(null);
     const chunksRef = useRef([]);
+    const frameSeqRef = useRef(0);
+    // Send interval negotiated by the server ('frame_rate' event), 0 = every pose result
+    const sendIntervalRef = useRef(0);
+    const nextSendRef = useRef(0);
     const [socket, setSocket] = useState(null);
     const [stats, setStats] = useState({ reps: 0, feedback: "Raise palm to start", stage: null, completed: false, isActive: false });
     const [gestureProgress, setGestureProgress] = useState(0);
@@ -25,6 +62,7 @@ const ExerciseMonitor = ({ exerciseType, userId, onBack }) => {
     const [showCongrats, setShowCongrats] = useState(false);
     const [isUploading, setIsUploading] = useState(false);
     const [uploadStatus, setUploadStatus] = useState(null); // 'success' | 'error'
+    const [analysis, setAnalysis] = useState(null); // Server-side video analysis, once its job finishes
 
     useEffect(() => {
         // Initialize Socket connection
@@ -36,9 +74,22 @@ const ExerciseMonitor = ({ exerciseType, userId, onBack }) => {
             setIsConnected(true);
         });
 
+        // Server sends only changed fields, with a full keyframe every so often to resync
         newSocket.on('stats_update', (data) => {
-            setStats(data);
-            setGestureProgress(data.gestureProgress || 0);
+            setStats(prev => (data.keyframe ? data : { ...prev, ...data }));
+            if (data.gestureProgress !== undefined) {
+                setGestureProgress(data.gestureProgress || 0);
+            }
+        });
+
+        // Server asks for fewer landmark frames when busy or when the exercise needs less
+        newSocket.on('frame_rate', ({ fps }) => {
+            sendIntervalRef.current = fps > 0 ? 1000 / fps : 0;
+        });
+
+        // Uploaded video analysis runs as a background job and reports back here
+        newSocket.on('analysis_complete', (job) => {
+            setAnalysis(job);
         });
 
         newSocket.on('disconnect', () => {
@@ -194,13 +245,25 @@ const ExerciseMonitor = ({ exerciseType, userId, onBack }) => {
                 angles['right_knee'] = calculateAngle(landmarks[24], landmarks[26], landmarks[28]);
             }
 
-            // 5. Emit
-            if (socket.connected) {
-                socket.emit('process_data', {
-                    type: exerciseType,
-                    landmarks: normalizedLandmarks,
-                    angles: angles
-                });
+            // 5. Emit at the negotiated rate (compact binary frame when the exercise has a wire id, JSON otherwise)
+            // Deadlines advance by the interval rather than restarting at each send, so a rate that
+            // does not divide the camera rate (20 of 30 fps) averages out instead of dropping to 15 fps
+            const now = performance.now();
+            if (socket.connected && now >= nextSendRef.current) {
+                // After a stall, resume at the current frame instead of sending a burst to catch up
+                nextSendRef.current = Math.max(nextSendRef.current + sendIntervalRef.current, now);
+                const exerciseId = EXERCISE_IDS[exerciseType];
+                if (exerciseId) {
+                    frameSeqRef.current += 1;
+                    const hipCenter = { x: hipCenterX, y: hipCenterY, z: hipCenterZ };
+                    socket.emit('process_data', encodeFrame(exerciseId, frameSeqRef.current, landmarks, hipCenter));
+                } else {
+                    socket.emit('process_data', {
+                        type: exerciseType,
+                        landmarks: normalizedLandmarks,
+                        angles: angles
+                    });
+                }
             }
         }
     }, [socket, exerciseType]);
@@ -275,19 +338,9 @@ const ExerciseMonitor = ({ exerciseType, userId, onBack }) => {
             return;
         }
 
-        const formData = new FormData();
-        formData.append('video', videoBlob, 'exercise_session.webm');
-        formData.append('userId', userId); // Use prop
-        formData.append('exerciseType', exerciseType);
-        formData.append('reps', stats.reps);
-
         try {
-            const response = await fetch('http://localhost:8000/api/upload-video', {
-                method: 'POST',
-                body: formData,
-            });
-
-            if (response.ok) {
+            const ok = await uploadInChunks(videoBlob);
+            if (ok) {
                 console.log("Video uploaded successfully");
                 setUploadStatus('success');
             } else {
@@ -302,6 +355,62 @@ const ExerciseMonitor = ({ exerciseType, userId, onBack }) => {
         }
     };
 
+    // Chunked, resumable upload (see /api/uploads in backend/app.py): each chunk is sent at the
+    // server's acknowledged offset; after a failed chunk we ask for the offset and resume from there.
+    const uploadInChunks = async (videoBlob, maxRetries = 5) => {
+        const startResponse = await fetch(`${API_URL}/api/uploads`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({
+                userId,
+                exerciseType,
+                reps: stats.reps,
+                filename: 'exercise_session.webm',
+                totalSize: videoBlob.size,
+                socketId: socket && socket.id // Where to send 'analysis_complete'
+            })
+        });
+        if (!startResponse.ok) return false;
+        const { uploadId, chunkSize } = await startResponse.json();
+
+        let offset = 0;
+        let retries = 0;
+        while (offset < videoBlob.size) {
+            try {
+                const response = await fetch(`${API_URL}/api/uploads/${uploadId}?offset=${offset}`, {
+                    method: 'PUT',
+                    headers: { 'Content-Type': 'application/octet-stream' },
+                    body: videoBlob.slice(offset, offset + chunkSize)
+                });
+                if (response.ok || response.status === 409) {
+                    const acknowledged = (await response.json()).offset; // 409 carries the offset to resume from
+                    // A 409 at our own offset means an earlier PUT of this chunk is still running: back off
+                    if (response.ok || acknowledged !== offset) {
+                        offset = acknowledged;
+                        retries = 0;
+                        continue;
+                    }
+                } else if (response.status < 500) {
+                    return false;
+                }
+            } catch (error) {
+                console.warn("Chunk upload interrupted, resuming", error);
+            }
+
+            if (++retries > maxRetries) return false;
+            await new Promise(resolve => setTimeout(resolve, 1000 * retries));
+            try {
+                const status = await fetch(`${API_URL}/api/uploads/${uploadId}`);
+                if (status.ok) offset = (await status.json()).offset;
+            } catch (error) {
+                // Still offline, keep the last known offset and retry
+            }
+        }
+
+        const completeResponse = await fetch(`${API_URL}/api/uploads/${uploadId}/complete`, { method: 'POST' });
+        return completeResponse.ok;
+    };
+
     const calculateAngle = (a, b, c) => {
         const radians = Math.atan2(c.y - b.y, c.x - b.x) - Math.atan2(a.y - b.y, a.x - b.x);
         let angle = Math.abs(radians * 180.0 / Math.PI);
@@ -520,7 +629,13 @@ const ExerciseMonitor = ({ exerciseType, userId, onBack }) => {
                             )}
 
                             {!isUploading && uploadStatus === 'success' && (
-                                <p className="text-green-400 font-bold mb-6 text-sm">Video saved successfully!</p>
+                                <p className="text-green-400 font-bold mb-6 text-sm">
+                                    {analysis
+                                        ? (analysis.status === 'done'
+                                            ? `Video analyzed: ${analysis.result.reps} reps, score ${analysis.result.report.score}`
+                                            : "Video saved (analysis unavailable)")
+                                        : "Video saved, analyzing..."}
+                                </p>
                             )}
 
                             <button